@@ -0,0 +1,60 @@
+"""
+Reference implementation of the original serialization pipeline, which
+built each object with serialize_iterable, copied it into another dict with
+update, merged the include dict and finally rebuilt it with cleanup. Used
+by the benchmarks to compare against the single pass plan executor.
+"""
+from serializer import (
+    OBJECT_DUMPERS,
+    Serializable,
+    call_attribute,
+    cleanup,
+    copy_args,
+    empty,
+    is_callable,
+    unpack_args,
+    unpack_key,
+)
+
+
+def legacy_dumps(value, args):
+    if is_callable(value):
+        value = call_attribute(value)
+    if isinstance(value, Serializable):
+        return legacy_serialize(value, **copy_args(args))
+    if isinstance(value, list):
+        return [legacy_dumps(item, args) for item in value]
+    dumper = OBJECT_DUMPERS.resolve(type(value))
+    if dumper is None:
+        return value
+    return dumper(value, args)
+
+
+def legacy_serialize_iterable(serializable, iterable, exclude=None):
+    attr_sets = serializable.attribute_sets()
+    serialized = {}
+    for key, args in map(unpack_args, iterable):
+        if exclude and key in exclude:
+            continue
+        keys = attr_sets[key] if key in attr_sets else [(key, args)]
+        for key, args in map(unpack_args, keys):
+            model_attr, alias = unpack_key(key)
+            if not hasattr(serializable, model_attr):
+                value = empty
+            else:
+                value = getattr(serializable, model_attr)
+            serialized[alias] = legacy_dumps(value, args or {})
+    return serialized
+
+
+def legacy_serialize(serializable, only=None, exclude=None, include=None):
+    serialized = {}
+    if only:
+        serialized.update(legacy_serialize_iterable(serializable, only))
+    else:
+        serialized.update(legacy_serialize_iterable(
+            serializable, serializable.attributes(), exclude
+        ))
+    if include:
+        serialized.update(legacy_serialize_iterable(serializable, include))
+    return cleanup(serialized)
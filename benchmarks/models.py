@@ -0,0 +1,179 @@
+"""
+Synthetic model graphs for the benchmarks.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+from serializer import (
+    OBJECT_DUMPERS,
+    Field,
+    Schema,
+    Serializable,
+    register_dumper,
+)
+
+
+_classes = {}
+
+
+def model_class(width):
+    """
+    Returns a Serializable class with `width` scalar attributes (field_0 ...
+    field_<width - 1>) plus a `children` association that is only serialized
+    when included.
+    """
+    try:
+        return _classes[width]
+    except KeyError:
+        pass
+    names = ['field_%d' % index for index in range(width)]
+
+    def attributes(self):
+        return list(names)
+
+    def attribute_sets(self):
+        return {'first': names[:1]}
+
+    cls = type(
+        'Model%d' % width,
+        (Serializable, ),
+        {'attributes': attributes, 'attribute_sets': attribute_sets}
+    )
+    _classes[width] = cls
+    return cls
+
+
+VALUES = [
+    1,
+    'text',
+    1.5,
+    None,
+    True,
+    datetime(2011, 1, 1, 12, 30),
+    date(2011, 1, 1),
+    Decimal('10.25'),
+]
+
+
+def build_graph(width=10, depth=1, list_size=10):
+    """
+    Builds a tree of model objects, each node having `width` attributes and
+    `list_size` children, `depth` levels deep. Returns the root object.
+    """
+    cls = model_class(width)
+    obj = cls()
+    for index in range(width):
+        setattr(obj, 'field_%d' % index, VALUES[index % len(VALUES)])
+    if depth > 1:
+        obj.children = [
+            build_graph(width, depth - 1, list_size) for i in range(list_size)
+        ]
+    else:
+        obj.children = []
+    return obj
+
+
+def build_list(size=1000, width=10):
+    """
+    Returns a list of `size` flat model objects
+    """
+    return [build_graph(width, depth=1) for i in range(size)]
+
+
+def schema_class(width):
+    """
+    Returns a :class:`serializer.Schema` class declaring the same scalar
+    attributes as :func:`model_class`
+    """
+    key = ('schema', width)
+    try:
+        return _classes[key]
+    except KeyError:
+        pass
+    namespace = dict(
+        ('field_%d' % index, Field(type(VALUES[index % len(VALUES)])))
+        for index in range(width)
+    )
+    cls = _classes[key] = type('Schema%d' % width, (Schema, ), namespace)
+    return cls
+
+
+def build_schema_list(size=1000, width=10):
+    """
+    Returns a list of `size` schema objects
+    """
+    cls = schema_class(width)
+    return [
+        cls(**dict(
+            ('field_%d' % index, VALUES[index % len(VALUES)])
+            for index in range(width)
+        ))
+        for i in range(size)
+    ]
+
+
+class Reply(Serializable):
+    """
+    Node of a comment thread, replies are serialized by default
+    """
+
+    def __init__(self, index):
+        self.id = index
+        self.body = 'Reply %d' % index
+        self.created_at = VALUES[5]
+        self.replies = []
+
+    def attributes(self):
+        return ['id', 'body', 'created_at', 'replies']
+
+
+def build_thread(depth):
+    """
+    Returns the root of a comment thread nested `depth` levels deep
+    """
+    root = node = Reply(0)
+    for index in range(1, depth):
+        reply = Reply(index)
+        node.replies.append(reply)
+        node = reply
+    return root
+
+
+def include_spec(depth):
+    """
+    Returns the include spec serializing the children `depth` levels deep
+    """
+    spec = None
+    for level in range(depth - 1):
+        args = {'include': spec} if spec else {}
+        spec = [('children', args)]
+    return spec
+
+
+def count_objects(depth, list_size):
+    """
+    Returns the number of objects in a graph built with :func:`build_graph`
+    """
+    return sum(list_size ** level for level in range(depth))
+
+
+class Dummy(object):
+    pass
+
+
+def register_dummy_dumpers(count):
+    """
+    Registers `count` dumpers for unrelated classes, half by class and half
+    by class name, and returns a function which unregisters them.
+    """
+    keys = []
+    for index in range(count):
+        cls = type('Dummy%d' % index, (Dummy, ), {})
+        key = cls if index % 2 else cls.__name__
+        register_dumper(key, lambda a, b: None)
+        keys.append(key)
+
+    def unregister():
+        for key in keys:
+            del OBJECT_DUMPERS[key]
+    return unregister
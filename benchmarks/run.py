@@ -0,0 +1,344 @@
+"""
+Benchmark runner for the serialization hot paths.
+
+Usage::
+
+    python -m benchmarks.run                      # run all benchmarks
+    python -m benchmarks.run -k serialize         # run matching benchmarks
+    python -m benchmarks.run --save base.json     # save results as baseline
+    python -m benchmarks.run --compare base.json  # fail on regressions
+
+Each benchmark reports the throughput in serialized objects per second and
+the peak memory allocated by a single call, as measured by tracemalloc.
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from serializer import (
+    disable_codegen,
+    dump_object,
+    enable_codegen,
+    serialize,
+    serialize_iterative,
+    serialize_many,
+)
+from serializer.buffers import encoded
+from serializer.stream import iterencode_json
+from serializer.xmlwriter import dumps_xml
+
+from .legacy import legacy_serialize
+from .models import (
+    build_graph,
+    build_list,
+    build_schema_list,
+    build_thread,
+    count_objects,
+    include_spec,
+    register_dummy_dumpers,
+    VALUES,
+)
+
+
+BENCHMARKS = []
+
+
+def benchmark(func):
+    """
+    Registers a benchmark. A benchmark is a generator function taking the
+    `quick` flag and yielding (name, callable, objects per call) cases,
+    optionally followed by a teardown callable. The benchmarked callables
+    must not take arguments.
+    """
+    BENCHMARKS.append(func)
+    return func
+
+
+@benchmark
+def serialize_width(quick):
+    for width in (5, 50) if quick else (5, 20, 100):
+        obj = build_graph(width)
+        yield 'serialize[width=%d]' % width, lambda obj=obj: serialize(obj), 1
+
+
+@benchmark
+def serialize_depth(quick):
+    for depth, list_size in ((2, 5), (3, 5)) if quick else (
+        (2, 10), (3, 10), (4, 5)
+    ):
+        obj = build_graph(10, depth, list_size)
+        spec = include_spec(depth)
+        yield (
+            'serialize[depth=%d,list=%d]' % (depth, list_size),
+            lambda obj=obj, spec=spec: serialize(obj, include=spec),
+            count_objects(depth, list_size)
+        )
+
+
+@benchmark
+def serialize_include_tree(quick):
+    # Compares the single pass plan executor with the original pipeline,
+    # which allocated three to four dicts per object
+    for depth, list_size in ((3, 5), ) if quick else ((3, 10), (5, 4)):
+        obj = build_graph(10, depth, list_size)
+        spec = include_spec(depth)
+        for name, func in (
+            ('serialize_legacy', legacy_serialize),
+            ('serialize_single_pass', serialize),
+        ):
+            yield (
+                '%s[depth=%d,list=%d]' % (name, depth, list_size),
+                lambda func=func, obj=obj, spec=spec: func(obj, include=spec),
+                count_objects(depth, list_size)
+            )
+
+
+@benchmark
+def serialize_deep(quick):
+    # The recursive engine is limited by the recursion limit, the iterative
+    # one only by memory
+    for depth in (100, ) if quick else (100, 150):
+        root = build_thread(depth)
+        for name, func in (
+            ('serialize_recursive', serialize),
+            ('serialize_iterative', serialize_iterative),
+        ):
+            yield (
+                '%s[depth=%d]' % (name, depth),
+                lambda func=func, root=root: func(root),
+                depth
+            )
+    depth = 1000 if quick else 10000
+    root = build_thread(depth)
+    yield (
+        'serialize_iterative[depth=%d]' % depth,
+        lambda: serialize_iterative(root),
+        depth
+    )
+
+
+@benchmark
+def serialize_list(quick):
+    for size in (100, ) if quick else (100, 1000, 5000):
+        objects = build_list(size)
+        yield (
+            'serialize_loop[size=%d]' % size,
+            lambda objects=objects: [serialize(obj) for obj in objects],
+            size
+        )
+        yield (
+            'serialize_many[size=%d]' % size,
+            lambda objects=objects: serialize_many(objects),
+            size
+        )
+
+
+@benchmark
+def serialize_schema(quick):
+    for size in (100, ) if quick else (1000, 5000):
+        objects = build_schema_list(size)
+        yield (
+            'serialize_many_schema[size=%d]' % size,
+            lambda objects=objects: serialize_many(objects),
+            size
+        )
+
+
+@benchmark
+def serialize_codegen(quick):
+    for size in (100, ) if quick else (1000, 5000):
+        for name, objects in (
+            ('serialize_many_codegen', build_list(size)),
+            ('serialize_many_schema_codegen', build_schema_list(size)),
+        ):
+            enable_codegen()
+            yield (
+                '%s[size=%d]' % (name, size),
+                lambda objects=objects: serialize_many(objects),
+                size,
+                disable_codegen
+            )
+    obj = build_graph(10, 3, 5 if quick else 10)
+    spec = include_spec(3)
+    enable_codegen()
+    yield (
+        'serialize_codegen[depth=3]',
+        lambda: serialize(obj, include=spec),
+        count_objects(3, 5 if quick else 10),
+        disable_codegen
+    )
+
+
+@benchmark
+def dump_object_dumpers(quick):
+    for count in (0, 50) if quick else (0, 10, 100, 1000):
+        def dump_values():
+            for value in VALUES:
+                dump_object(value, {})
+        yield (
+            'dump_object[dumpers=%d]' % count,
+            dump_values,
+            len(VALUES),
+            register_dummy_dumpers(count)
+        )
+
+
+@benchmark
+def to_xml(quick):
+    obj = build_graph(10, 3, 5 if quick else 10)
+    spec = include_spec(3)
+    serialized = {'root': serialize(obj, include=spec)}
+    yield (
+        'dumps_xml[depth=3]',
+        lambda: dumps_xml(serialized),
+        count_objects(3, 5 if quick else 10)
+    )
+
+
+@benchmark
+def to_json(quick):
+    list_size = 5 if quick else 10
+    obj = build_graph(10, 3, list_size)
+    spec = include_spec(3)
+    yield (
+        'to_json[depth=3]',
+        lambda: obj.to_json(include=spec),
+        count_objects(3, list_size)
+    )
+    yield (
+        'iter_json[depth=3]',
+        lambda: ''.join(iterencode_json(obj, include=spec)),
+        count_objects(3, list_size)
+    )
+
+    def encode_pooled():
+        with encoded(obj, include=spec) as view:
+            return len(view)
+    yield (
+        'encode_pooled[depth=3]',
+        encode_pooled,
+        count_objects(3, list_size)
+    )
+
+
+def measure_time(func, min_time, repeat):
+    """
+    Returns the best time per call out of `repeat` rounds, each round running
+    for at least `min_time` seconds.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for i in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10:
+            break
+        number *= 10
+    best = elapsed / number
+    for i in range(repeat):
+        rounds = max(1, int(number * min_time / max(elapsed, 1e-9)))
+        gc.collect()
+        start = time.perf_counter()
+        for i in range(rounds):
+            func()
+        best = min(best, (time.perf_counter() - start) / rounds)
+    return best
+
+
+def measure_memory(func):
+    """
+    Returns the peak memory allocated during one call in kilobytes
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak / 1024.0
+
+
+def run(pattern=None, quick=False, out=sys.stdout):
+    """
+    Runs the benchmarks whose name contains `pattern` and returns the results
+    as a dict of benchmark name -> {'objects_per_sec': ..., 'peak_kb': ...}
+    """
+    min_time, repeat = (0.05, 2) if quick else (0.2, 5)
+    results = {}
+    for bench in BENCHMARKS:
+        for case in bench(quick):
+            name, func, objects = case[:3]
+            teardown = case[3] if len(case) > 3 else None
+            try:
+                if pattern and pattern not in name:
+                    continue
+                per_call = measure_time(func, min_time, repeat)
+                result = results[name] = {
+                    'objects_per_sec': objects / per_call,
+                    'peak_kb': measure_memory(func),
+                }
+            finally:
+                if teardown is not None:
+                    teardown()
+            out.write('%-40s %14.0f obj/s %10.1f KiB\n' % (
+                name, result['objects_per_sec'], result['peak_kb']
+            ))
+    return results
+
+
+def compare(results, baseline, threshold=0.2, out=sys.stdout):
+    """
+    Compares given results against baseline results and returns the names
+    of benchmarks whose throughput regressed more than `threshold`
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        ratio = (
+            result['objects_per_sec'] / baseline[name]['objects_per_sec']
+        )
+        flag = ''
+        if ratio < 1 - threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        out.write('%-40s %7.2fx%s\n' % (name, ratio, flag))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('-k', dest='pattern', help='run matching benchmarks')
+    parser.add_argument('--quick', action='store_true', help='smaller runs')
+    parser.add_argument('--save', help='save results to given file')
+    parser.add_argument('--compare', help='compare against given baseline')
+    parser.add_argument(
+        '--threshold', type=float, default=0.2,
+        help='allowed relative throughput regression (default 0.2)'
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.pattern, args.quick)
+    if args.save:
+        with open(args.save, 'w') as fp:
+            json.dump({
+                'python': platform.python_version(),
+                'results': results,
+            }, fp, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)['results']
+        sys.stdout.write('\n')
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,11 @@
-from xml.dom.minidom import Document
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
 try:
     import simplejson as _json
 except ImportError:
@@ -14,55 +21,88 @@ empty = Empty()
 
 def is_callable(object):
     _type = type(object).__name__
-    return _type == 'instancemethod' or _type == 'function'
+    return _type == 'method' or _type == 'function'
 
 
 def dumps(value, args):
     if is_callable(value):
-        value = value()
+        value = call_attribute(value)
     value = dump_object(value, args)
     return value
 
 
-class Dict2XML(object):
+_memo = ContextVar('serializer_memo', default=None)
+
+
+def call_attribute(method, wrap=None):
+    """
+    Calls given method valued attribute. Within a :func:`memoize` block the
+    results of bound methods are memoized per object and method.
+
+    :param wrap: function applied to the result before it is memoized,
+        :mod:`serializer.aio` uses it to memoize awaitable results as tasks
+        which can be awaited more than once
     """
-    Slightly modified version of
-    http://code.activestate.com/recipes/577739-dict2xml/
+    memo = _memo.get()
+    if memo is None or not hasattr(method, '__self__'):
+        return method()
+    obj = method.__self__
+    key = (id(obj), method.__func__)
+    try:
+        return memo[key][1]
+    except KeyError:
+        # The object is stored along with the result so that its id can not
+        # be reused by another object during the pass.
+        value = method()
+        if wrap is not None:
+            value = wrap(value)
+        memo[key] = (obj, value)
+        return value
+
+
+@contextmanager
+def memoize():
     """
+    Context manager which memoizes the results of method valued attributes
+    within the block, so that each method is called at most once per object
+    even if it is reached through several attribute sets or association
+    paths. The memo is local to the current thread or asyncio task, and to
+    the tasks it starts, and is discarded when the block exits. Nested
+    blocks share the outermost memo.
 
-    def __init__(self, structure):
-        self.doc = Document()
-
-        if len(structure) == 1:
-            root_name = str(structure.keys()[0])
-            self.root = self.doc.createElement(root_name)
-
-            self.doc.appendChild(self.root)
-            self.build(self.root, structure[root_name])
-
-    def build(self, father, structure):
-        if isinstance(structure, dict):
-            for key in structure:
-                tag = self.doc.createElement(key)
-                father.appendChild(tag)
-                self.build(tag, structure[key])
-
-        elif isinstance(structure, list):
-            grand_father = father.parentNode
-            tag_name = father.tagName
-            grand_father.removeChild(father)
-            for key in structure:
-                tag = self.doc.createElement(tag_name)
-                self.build(tag, key)
-                grand_father.appendChild(tag)
+    Examples::
 
-        else:
-            data = str(structure)
-            tag = self.doc.createTextNode(data)
-            father.appendChild(tag)
+        >>> with memoize():
+        ...     data = serialize_many(users, include=[('team', {...})])
+    """
+    if _memo.get() is not None:
+        yield
+        return
+    token = _memo.set({})
+    try:
+        yield
+    finally:
+        _memo.reset(token)
 
-    def __call__(self, *args, **kwargs):
-        return self.doc.toprettyxml(*args, **kwargs)
+
+class Dict2XML(object):
+    """
+    Pretty printing dict to XML converter, kept for backwards compatibility.
+    Produces the same output as the former xml.dom.minidom based
+    implementation. New code should use :func:`serializer.xmlwriter.dumps_xml`
+    """
+
+    def __init__(self, structure):
+        self.structure = structure
+
+    def __call__(self, indent='\t', newl='\n', encoding=None):
+        return dumps_xml(
+            self.structure,
+            pretty=True,
+            indent=indent,
+            newl=newl,
+            encoding=encoding
+        )
 
 
 class Serializable(object):
@@ -71,6 +111,9 @@ class Serializable(object):
     For more info see:
     http://api.rubyonrails.org/classes/ActiveModel/Serializers/JSON.html
     """
+    # Slots let slotted subclasses, such as schema classes, go without an
+    # instance dictionary. Subclasses without __slots__ are unaffected.
+    __slots__ = ('__weakref__', )
 
     def attributes(self):
         """
@@ -112,7 +155,8 @@ class Serializable(object):
         """
         return {}
 
-    def to_xml(self, only=None, exclude=None, include=None, **kwargs):
+    def to_xml(self, only=None, exclude=None, include=None, root=None,
+               pretty=False, **kwargs):
         """
         Returns the object attributes serialized in xml format
 
@@ -122,12 +166,21 @@ class Serializable(object):
                         returning xml
         :param include: a list containing attribute names to include in the
                         returning xml
+        :param root: name of the root element, if not given the only
+                     attribute of the serialized object is used as the root
+        :param pretty: whether or not to indent the returned xml
+        :param kwargs: additional keyword arguments (indent, newl, encoding)
+                       passed to :func:`serializer.xmlwriter.dumps_xml`
         """
-        return Dict2XML(
-            self.as_json(only=only, exclude=exclude, include=include)
-        )(**kwargs)
+        return dumps_xml(
+            self.as_json(only=only, exclude=exclude, include=include),
+            root=root,
+            pretty=pretty,
+            **kwargs
+        )
 
-    def to_json(self, only=None, exclude=None, include=None):
+    def to_json(self, only=None, exclude=None, include=None, options=None,
+                backend=None, as_bytes=False):
         """
         Returns the object attributes serialized in json format
 
@@ -137,10 +190,86 @@ class Serializable(object):
                         returning json
         :param include: a list containing attribute names to include in the
                         returning json
+        :param options: :class:`SerializeOptions` object to use instead of
+                        only, exclude and include
+        :param backend: name of the JSON backend to use, see
+                        :mod:`serializer.backends`
+        :param as_bytes: whether or not to return UTF-8 encoded bytes
+                         instead of a string
+        """
+        if options is not None:
+            if as_bytes:
+                return options.dumpb(self)
+            return options.dumps(self)
+        json_backend = get_json_backend(backend)
+        value = self.as_json(only=only, exclude=exclude, include=include)
+        if as_bytes:
+            return json_backend.dumpb(value)
+        return json_backend.dumps(value)
+
+    def to_msgpack(self, only=None, exclude=None, include=None, **kwargs):
+        """
+        Returns the object attributes serialized in MessagePack format, see
+        :mod:`serializer.formats`. Requires the msgpack package.
+        """
+        return to_format(
+            self, 'msgpack', only=only, exclude=exclude, include=include,
+            **kwargs
+        )
+
+    def to_cbor(self, only=None, exclude=None, include=None, **kwargs):
+        """
+        Returns the object attributes serialized in CBOR format, see
+        :mod:`serializer.formats`. Requires the cbor2 package.
+        """
+        return to_format(
+            self, 'cbor', only=only, exclude=exclude, include=include,
+            **kwargs
+        )
+
+    def to_format(self, name, only=None, exclude=None, include=None,
+                  **kwargs):
+        """
+        Returns the object attributes serialized in the format registered
+        with given name, see :func:`serializer.formats.register_format`
+        """
+        return to_format(
+            self, name, only=only, exclude=exclude, include=include, **kwargs
+        )
+
+    def iter_json(self, only=None, exclude=None, include=None,
+                  chunk_size=8192, **kwargs):
+        """
+        Returns a generator yielding the object serialized in json format in
+        chunks, without building the intermediate dictionary or the whole
+        json string. See :func:`serializer.stream.iterencode_json`.
+        """
+        return iterencode_json(
+            self,
+            only=only,
+            exclude=exclude,
+            include=include,
+            chunk_size=chunk_size,
+            **kwargs
+        )
+
+    def to_json_stream(self, fp, only=None, exclude=None, include=None,
+                       chunk_size=8192, **kwargs):
+        """
+        Writes the object serialized in json format into given file-like
+        object incrementally. See :func:`serializer.stream.dump_json`.
         """
-        return _json.dumps(self.as_json(), use_decimal=True)
+        dump_json(
+            self,
+            fp,
+            only=only,
+            exclude=exclude,
+            include=include,
+            chunk_size=chunk_size,
+            **kwargs
+        )
 
-    def as_json(self, only=None, exclude=None, include=None):
+    def as_json(self, only=None, exclude=None, include=None, options=None):
         """
         Returns object attributes as a dictionary with jsonified values
 
@@ -150,6 +279,8 @@ class Serializable(object):
                         returning dictionary
         :param include: a list containing attribute names to include in the
                         returning dictionary
+        :param options: :class:`SerializeOptions` object to use instead of
+                        only, exclude and include
 
         Without any options, the returned JSON string will include all the
         fields returned by the models attribute() method. For example:
@@ -231,8 +362,35 @@ class Serializable(object):
             ]
         }
         """
+        if options is not None:
+            return options.serialize(self)
         return serialize(self, only=only, exclude=exclude, include=include)
 
+    def as_json_async(self, only=None, exclude=None, include=None):
+        """
+        Returns a coroutine serializing the object like :meth:`as_json` but
+        awaiting awaitable attribute values concurrently. See
+        :func:`serializer.aio.serialize_async`.
+
+        >>> await user.as_json_async(include=['posts'])
+        """
+        return serialize_async(
+            self, only=only, exclude=exclude, include=include
+        )
+
+    @classmethod
+    def as_json_many(cls, objects, only=None, exclude=None, include=None):
+        """
+        Returns a list of dictionaries with jsonified values for given
+        objects. See :func:`serialize_many` for details.
+
+        >>> User.as_json_many(users, only=['first_name'])
+        [{"first_name": "John"}, {"first_name": "Jack"}]
+        """
+        return serialize_many(
+            objects, only=only, exclude=exclude, include=include
+        )
+
 
 def serialize(serializable, only=None, exclude=None, include=None):
     """
@@ -248,34 +406,794 @@ def serialize(serializable, only=None, exclude=None, include=None):
         attribute names can be any properties of `serializable` (even method
         names)
     """
-    serialized = {}
-    if only:
-        serialized.update(
-            serialize_iterable(serializable, only)
+    return run_plan(
+        compile_plan(
+            serializable, only=only, exclude=exclude, include=include
+        ),
+        serializable
+    )
+
+
+def serialize_many(objects, only=None, exclude=None, include=None,
+                   spec_key=None):
+    """
+    Serializes given iterable of objects into a list of dictionaries.
+
+    This is equivalent to ``[serialize(obj, ...) for obj in objects]`` but
+    the spec is frozen only once and the serialization plan is resolved only
+    once per distinct class in given iterable.
+
+    :param objects: iterable of objects to be serialized
+    :param only: same as in :func:`serialize`
+    :param exclude: same as in :func:`serialize`
+    :param include: same as in :func:`serialize`
+    :param spec_key: pre-computed frozen spec, see :func:`compile_plan`
+    """
+    if spec_key is None:
+        try:
+            spec_key = freeze_spec_key(only, exclude, include)
+            hash(spec_key)
+        except TypeError:
+            spec_key = None
+    plans = {}
+    serialized = []
+    append = serialized.append
+    for obj in objects:
+        try:
+            plan = plans[type(obj)]
+        except KeyError:
+            plan = plans[type(obj)] = compile_plan(
+                obj,
+                only=only,
+                exclude=exclude,
+                include=include,
+                spec_key=spec_key
+            )
+        append(run_plan(plan, obj))
+    return serialized
+
+
+class LRUCache(object):
+    """
+    Small thread safe least recently used cache.
+
+    :param maxsize: maximum number of entries kept in the cache, the least
+        recently used entries are evicted first
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return default
+            self._data[key] = value
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def discard(self, predicate):
+        """
+        Removes all entries whose key matches given predicate
+        """
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SerializationCycleError(ValueError):
+    """
+    Raised by :func:`track_identity` when an object graph contains a cycle
+    and no reference function is given
+    """
+
+
+class IdentityTracker(object):
+    """
+    Per pass state of :func:`track_identity`
+    """
+
+    def __init__(self, reference=None):
+        self.reference = reference
+        self.serialized = {}
+        self.in_progress = set()
+
+    def run(self, plan, obj):
+        # An object reached again with another plan is not a cycle, a finite
+        # spec can revisit its ancestors. An unbounded cycle always comes
+        # back with the same plan.
+        key = (id(obj), plan)
+        if key in self.in_progress:
+            if self.reference is None:
+                raise SerializationCycleError(
+                    'Cycle detected while serializing %r' % (obj, )
+                )
+            return self.reference(obj)
+        try:
+            serialized = self.serialized[key][1]
+        except KeyError:
+            pass
+        else:
+            if self.reference is None:
+                return serialized
+            return self.reference(obj)
+        self.in_progress.add(key)
+        try:
+            serialized = plan(obj)
+        finally:
+            self.in_progress.discard(key)
+        # The object is kept alive along with its serialized form so that its
+        # id can not be reused by another object during the pass.
+        self.serialized[key] = (obj, serialized)
+        return serialized
+
+
+_identity = ContextVar('serializer_identity', default=None)
+
+
+def run_plan(plan, obj):
+    """
+    Applies given serialization plan to given object, tracking the object
+    identity within a :func:`track_identity` block
+    """
+    tracker = _identity.get()
+    if tracker is None:
+        return plan(obj)
+    return tracker.run(plan, obj)
+
+
+@contextmanager
+def track_identity(reference=None):
+    """
+    Context manager which makes serialization identity aware within the
+    block:
+
+    - An object serialized more than once with the same spec is serialized
+      only once and the same dictionary is reused for all occurrences.
+    - Cycles in the object graph raise :class:`SerializationCycleError`
+      instead of recursing until the recursion limit is hit.
+
+    If a `reference` function is given, repeated objects and objects closing
+    a cycle are serialized as ``reference(obj)`` instead.
+
+    The tracking state is local to the current thread or asyncio task, and
+    to the tasks it starts, and is discarded when the block exits. Nested
+    blocks share the outermost state.
+
+    Examples::
+
+        >>> with track_identity(reference=lambda obj: {'$ref': obj.id}):
+        ...     data = serialize_many(users, include=['team'])
+
+    :param reference: function returning the reference for a repeated object
+    """
+    if _identity.get() is not None:
+        yield
+        return
+    token = _identity.set(IdentityTracker(reference))
+    try:
+        yield
+    finally:
+        _identity.reset(token)
+
+
+def cached_attribute(ttl=None, maxsize=1024):
+    """
+    Decorator which caches the results of a method valued attribute across
+    serialization passes. Results are cached per object, the least recently
+    used results are evicted when the cache grows over `maxsize` entries and
+    results older than `ttl` seconds are recomputed.
+
+    The decorated method gets `invalidate(obj)` and `clear()` functions for
+    explicit invalidation.
+
+    Examples::
+
+        >>> class User(Serializable):
+        ...     @cached_attribute(ttl=60)
+        ...     def post_count(self):
+        ...         return self.posts.count()
+        ...
+        >>> User.post_count.invalidate(user)
+
+    :param ttl: time to live of cached results in seconds, None for no
+        expiration
+    :param maxsize: maximum number of cached results
+    """
+    clock = getattr(time, 'monotonic', time.time)
+
+    def decorator(method):
+        cache = LRUCache(maxsize=maxsize)
+
+        @wraps(method)
+        def wrapper(self):
+            entry = cache.get(id(self))
+            if entry is not None:
+                ref, expires, value = entry
+                if ref() is self and (expires is None or expires > clock()):
+                    return value
+            value = method(self)
+            cache[id(self)] = (
+                make_ref(self),
+                None if ttl is None else clock() + ttl,
+                value
+            )
+            return value
+
+        def invalidate(obj):
+            cache.pop(id(obj))
+
+        wrapper.invalidate = invalidate
+        wrapper.clear = cache.clear
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def make_ref(obj):
+    """
+    Returns a weak reference to given object, or a strong reference if the
+    object does not support weak references
+    """
+    try:
+        return weakref.ref(obj)
+    except TypeError:
+        return lambda: obj
+
+
+class PlanArgs(dict):
+    """
+    Attribute arguments of a compiled plan step. Behaves exactly like the
+    argument dict given in the serialization spec but additionally carries
+    the pre-computed cache key of the nested spec and, for declared schema
+    fields, the pre-resolved dumper of the field (None for values which are
+    left untouched).
+    """
+    __slots__ = ('spec_key', 'dumper')
+
+
+class SerializationPlan(object):
+    """
+    Pre-resolved list of serialization steps for given class and
+    only / exclude / include spec. Each step is a tuple of (attribute name,
+    alias, args). Plans for nested objects are resolved lazily from the
+    plan cache when the nested value is dumped.
+
+    Plans are built with :func:`compile_plan` and should be considered
+    immutable.
+    """
+    __slots__ = ('steps', 'unique_steps', 'function')
+
+    def __init__(self, steps):
+        self.steps = tuple(steps)
+        # Specialized function generated by serializer.codegen, if enabled
+        self.function = None
+        # Steps with one step per alias, the last step for each alias wins
+        # the same way as it does when the steps are applied to a dict.
+        positions = {}
+        unique_steps = []
+        for step in self.steps:
+            if step[1] in positions:
+                unique_steps[positions[step[1]]] = step
+            else:
+                positions[step[1]] = len(unique_steps)
+                unique_steps.append(step)
+        self.unique_steps = tuple(unique_steps)
+
+    @classmethod
+    def compile(cls, serializable, only=None, exclude=None, include=None):
+        attr_sets = serializable.attribute_sets()
+        fields = getattr(type(serializable), '__fields__', None) or {}
+        steps = []
+
+        def add_steps(iterable, exclude=None):
+            if isinstance(iterable, str):
+                iterable = [iterable]
+            for key, args in map(unpack_args, iterable):
+                if exclude and key in exclude:
+                    continue
+                if key in attr_sets:
+                    for subkey, subargs in map(
+                        unpack_args, attr_sets[key]
+                    ):
+                        add_step(subkey, subargs)
+                else:
+                    add_step(key, args)
+
+        def add_step(key, args):
+            model_attr, alias = unpack_key(key)
+            args = compile_args(args)
+            field = fields.get(model_attr)
+            if field is not None:
+                if alias == model_attr and field.alias is not None:
+                    alias = field.alias
+                field.compile(args)
+            steps.append((model_attr, alias, args))
+
+        if only:
+            add_steps(only)
+        else:
+            add_steps(serializable.attributes(), exclude)
+        if include:
+            add_steps(include)
+        return cls(steps)
+
+    def __call__(self, serializable):
+        if self.function is not None:
+            return self.function(serializable)
+        serialized = {}
+        for attr, alias, args in self.steps:
+            value = dumps(getattr(serializable, attr, empty), args)
+            if value is empty:
+                serialized.pop(alias, None)
+            else:
+                serialized[alias] = value
+        return serialized
+
+
+#: Cache of compiled serialization plans keyed by class and frozen spec
+PLAN_CACHE = LRUCache(maxsize=1024)
+
+
+def freeze_spec(value):
+    """
+    Returns a hashable representation of given serialization spec (the
+    value of only, exclude or include argument).
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_spec(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(
+            sorted((key, freeze_spec(item)) for key, item in value.items())
         )
-    else:
-        serialized.update(
-            serialize_iterable(
-                serializable, serializable.attributes(), exclude
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+
+def compile_args(args):
+    """
+    Converts given attribute args into :class:`PlanArgs`
+    """
+    if not args:
+        args = {}
+    compiled = PlanArgs(args)
+    args = copy_args(args)
+    compiled.spec_key = freeze_spec_key(**args)
+    return compiled
+
+
+def freeze_spec_key(only=None, exclude=None, include=None):
+    """
+    Returns the plan cache key for given only / exclude / include spec
+    """
+    return freeze_spec(only), freeze_spec(exclude), freeze_spec(include)
+
+
+SPEC_ARGS = ('only', 'exclude', 'include')
+
+
+def validate_spec(value, name='spec'):
+    """
+    Validates given only / exclude / include spec and raises ValueError if
+    it is malformed. A valid spec is either None, an attribute name, or a
+    list of attribute names and (attribute name, args) tuples whose args
+    may contain only, exclude and include specs of their own.
+    """
+    if value is None or isinstance(value, str):
+        return
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(
+            '%s must be a string or a list, got %r' % (name, value)
+        )
+    for item in value:
+        if isinstance(item, str):
+            continue
+        if (not isinstance(item, tuple) or len(item) != 2 or
+                not isinstance(item[0], str) or
+                not isinstance(item[1], dict)):
+            raise ValueError(
+                '%s items must be attribute names or (name, args) tuples, '
+                'got %r' % (name, item)
             )
+        for key, subspec in item[1].items():
+            if key not in SPEC_ARGS:
+                raise ValueError(
+                    'Unknown argument %r for attribute %r' % (key, item[0])
+                )
+            validate_spec(subspec, key)
+
+
+class SerializeOptions(object):
+    """
+    Reusable, hashable set of serialization options: an only / exclude /
+    include spec validated and frozen once plus the JSON encoder settings.
+    Options objects are meant to be built once (for example per endpoint)
+    and reused across calls.
+
+    Examples::
+
+        >>> USER_LIST = SerializeOptions(
+        ...     only=['id', 'name'],
+        ...     include=[('team', {'only': ['name']})],
+        ...     sort_keys=True
+        ... )
+        >>> user.to_json(options=USER_LIST)
+        '{"id": 1, "name": "John", "team": {"name": "Team A"}}'
+
+    :param only: same as in :func:`serialize`
+    :param exclude: same as in :func:`serialize`
+    :param include: same as in :func:`serialize`
+    :param backend: name of the JSON backend, see :mod:`serializer.backends`
+    :param encoder_options: keyword arguments for the JSON encoder, such as
+        use_decimal, separators and sort_keys
+    """
+    __slots__ = (
+        'only', 'exclude', 'include', 'spec_key', 'backend',
+        'encoder_options', '_hash'
+    )
+
+    def __init__(self, only=None, exclude=None, include=None, backend=None,
+                 **encoder_options):
+        for name, value in zip(SPEC_ARGS, (only, exclude, include)):
+            validate_spec(value, name)
+        self.only = only
+        self.exclude = exclude
+        self.include = include
+        self.spec_key = freeze_spec_key(only, exclude, include)
+        self.backend = backend
+        self.encoder_options = encoder_options
+        self._hash = hash((
+            self.spec_key,
+            backend,
+            freeze_spec(encoder_options)
+        ))
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        # Rebuild on unpickling, string hashes differ between processes
+        return (make_options, (
+            self.only,
+            self.exclude,
+            self.include,
+            self.backend,
+            self.encoder_options
+        ))
+
+    def __eq__(self, other):
+        if not isinstance(other, SerializeOptions):
+            return NotImplemented
+        return (
+            self.spec_key == other.spec_key and
+            self.backend == other.backend and
+            self.encoder_options == other.encoder_options
         )
-    if include:
-        serialized.update(serialize_iterable(serializable, include))
 
-    return cleanup(serialized)
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __repr__(self):
+        return (
+            'SerializeOptions(only=%r, exclude=%r, include=%r, backend=%r%s)'
+        ) % (
+            self.only,
+            self.exclude,
+            self.include,
+            self.backend,
+            ''.join(
+                ', %s=%r' % item
+                for item in sorted(self.encoder_options.items())
+            )
+        )
 
+    @property
+    def spec(self):
+        """
+        The only / exclude / include spec as keyword arguments
+        """
+        return dict(
+            only=self.only, exclude=self.exclude, include=self.include
+        )
+
+    def plan(self, serializable):
+        """
+        Returns the serialization plan for given object
+        """
+        return compile_plan(
+            serializable, spec_key=self.spec_key, **self.spec
+        )
+
+    def serialize(self, serializable):
+        """
+        Serializes given object into a dictionary
+        """
+        return run_plan(self.plan(serializable), serializable)
 
-OBJECT_DUMPERS = {
-    Serializable: lambda a, b: serialize(a, **copy_args(b)),
-    'datetime': lambda a, b: a.strftime('%Y-%m-%dT%H:%M:%SZ') if a else None,
-    'date': lambda a, b: a.isoformat() if a else None,
-    list: lambda a, b: [dumps(c, b) for c in a],
-}
+    def serialize_many(self, objects):
+        """
+        Serializes given objects into a list of dictionaries
+        """
+        return serialize_many(objects, spec_key=self.spec_key, **self.spec)
+
+    def dumps(self, serializable):
+        """
+        Serializes given object into a JSON string
+        """
+        return get_json_backend(self.backend).dumps(
+            self.serialize(serializable), **self.encoder_options
+        )
+
+    def dumpb(self, serializable):
+        """
+        Serializes given object into UTF-8 encoded JSON bytes
+        """
+        return get_json_backend(self.backend).dumpb(
+            self.serialize(serializable), **self.encoder_options
+        )
+
+
+def make_options(only, exclude, include, backend, encoder_options):
+    return SerializeOptions(
+        only=only,
+        exclude=exclude,
+        include=include,
+        backend=backend,
+        **encoder_options
+    )
+
+
+def compile_plan(serializable, only=None, exclude=None, include=None,
+                 spec_key=None):
+    """
+    Returns a :class:`SerializationPlan` for given object and spec. Compiled
+    plans are cached per class in :data:`PLAN_CACHE`, hence attributes() and
+    attribute_sets() of given object are only consulted on the first
+    serialization with given spec.
+
+    :param serializable: object whose class the plan is compiled for
+    :param only: same as in :func:`serialize`
+    :param exclude: same as in :func:`serialize`
+    :param include: same as in :func:`serialize`
+    :param spec_key: pre-computed frozen spec, if given the spec is not
+        frozen again
+    """
+    try:
+        if spec_key is None:
+            spec_key = freeze_spec_key(only, exclude, include)
+        key = (type(serializable), spec_key)
+        plan = PLAN_CACHE.get(key)
+    except TypeError:
+        # Unhashable spec, compile without caching
+        return SerializationPlan.compile(
+            serializable, only=only, exclude=exclude, include=include
+        )
+    if plan is None:
+        plan = SerializationPlan.compile(
+            serializable, only=only, exclude=exclude, include=include
+        )
+        specialize(plan, type(serializable))
+        PLAN_CACHE[key] = plan
+    return plan
+
+
+def nested_plan(serializable, args):
+    """
+    Returns the plan for a nested object dumped with given attribute args.
+    Plans already compiled for the pre-computed spec key of the args are
+    looked up directly, without copying the args into keyword arguments.
+    """
+    spec_key = getattr(args, 'spec_key', None)
+    if spec_key is not None:
+        try:
+            plan = PLAN_CACHE.get((type(serializable), spec_key))
+        except TypeError:
+            plan = None
+        if plan is not None:
+            return plan
+    return compile_plan(serializable, spec_key=spec_key, **copy_args(args))
+
+
+def invalidate_plans(cls=None):
+    """
+    Invalidates compiled serialization plans. This should be called whenever
+    the return value of attributes() or attribute_sets() of some class
+    changes at runtime.
+
+    :param cls: if given only the plans of this class (and its subclasses)
+        are invalidated, otherwise the whole plan cache is cleared
+    """
+    if cls is None:
+        PLAN_CACHE.clear()
+    else:
+        PLAN_CACHE.discard(lambda key: issubclass(key[0], cls))
+
+
+def dump_serializable(serializable, args):
+    """
+    Dumper for nested :class:`Serializable` objects
+    """
+    return run_plan(nested_plan(serializable, args), serializable)
+
+
+def dump_list(values, args):
+    """
+    Dumper for lists and other iterables such as tuples, sets, generators
+    and ORM query objects. The iterable is consumed into a list, the
+    streaming encoder in :mod:`serializer.stream` consumes it lazily
+    instead. Serializable items using the default dumper are
+    serialized with a plan resolved once per class, other items are dumped
+    one by one with :func:`dumps`.
+    """
+    plans = {}
+    dumped = []
+    append = dumped.append
+    for value in values:
+        type_ = type(value)
+        try:
+            plan = plans[type_]
+        except KeyError:
+            plan = None
+            if (isinstance(value, Serializable) and
+                    OBJECT_DUMPERS.resolve(type_) is dump_serializable):
+                plan = nested_plan(value, args)
+            plans[type_] = plan
+        if plan is None:
+            append(dumps(value, args))
+        else:
+            append(run_plan(plan, value))
+    return dumped
+
+
+def dump_datetime(value, args):
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ') if value else None
+
+
+def dump_date(value, args):
+    return value.isoformat() if value else None
+
+
+class DumperRegistry(dict):
+    """
+    Dict of dumpers keyed by class or class name with a per-type dispatch
+    cache.
+
+    Dumpers registered with a class match instances of that class and its
+    subclasses, dumpers registered with a class name only match instances
+    of exactly that class. For given type the dumper is resolved as
+    follows, the first match wins:
+
+    1. dumper registered for the exact type
+    2. dumper registered for the name of the type
+    3. dumper registered for the closest base class in the MRO of the type
+    4. the first registered abstract base class (such as
+       collections.abc.Iterable) the type is a virtual subclass of
+
+    Registering None as the dumper of a class stops the lookup, leaving the
+    instances of the class and its subclasses untouched.
+
+    Resolved dumpers are cached per type and in compiled serialization
+    plans. Any modification of the registry invalidates both.
+    """
+
+    #: Types which are resolved eagerly whenever the cache is rebuilt
+    SCALAR_TYPES = (type(None), bool, int, float, str)
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self._cache = {}
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Clears the dispatch cache and the compiled serialization plans
+        """
+        cache = {}
+        for type_ in self.SCALAR_TYPES:
+            cache[type_] = self._resolve(type_)
+        self._cache = cache
+        invalidate_plans()
+
+    def _resolve(self, type_):
+        if type_ in self:
+            return dict.__getitem__(self, type_)
+        if type_.__name__ in self:
+            return dict.__getitem__(self, type_.__name__)
+        for base in getattr(type_, '__mro__', (type_, ))[1:]:
+            if base in self:
+                return dict.__getitem__(self, base)
+        for key in self:
+            if isinstance(key, type) and issubclass(type_, key):
+                return dict.__getitem__(self, key)
+        return None
+
+    def resolve(self, type_):
+        """
+        Returns the dumper for given type or None if no dumper matches
+        """
+        try:
+            return self._cache[type_]
+        except KeyError:
+            dumper = self._cache[type_] = self._resolve(type_)
+            return dumper
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self.invalidate()
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self.invalidate()
+
+    def clear(self):
+        dict.clear(self)
+        self.invalidate()
+
+    def pop(self, *args):
+        value = dict.pop(self, *args)
+        self.invalidate()
+        return value
+
+    def popitem(self):
+        item = dict.popitem(self)
+        self.invalidate()
+        return item
+
+    def setdefault(self, key, default=None):
+        value = dict.setdefault(self, key, default)
+        self.invalidate()
+        return value
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        self.invalidate()
+
+
+OBJECT_DUMPERS = DumperRegistry({
+    Serializable: dump_serializable,
+    'datetime': dump_datetime,
+    'date': dump_date,
+    list: dump_list,
+})
+# Iterables which are not sequences of values
+for _type in (str, bytes, bytearray, memoryview, dict, Mapping):
+    OBJECT_DUMPERS[_type] = None
+del _type
+OBJECT_DUMPERS[Iterable] = dump_list
 
 
 def register_dumper(key, dumper_callable):
     """
-    Registers new dumper for given class type
+    Registers new dumper for given class type. If a dumper already exists
+    for given key it is replaced.
 
     Examples::
         >>> class MyClassA(object):
@@ -304,20 +1222,30 @@ def register_dumper(key, dumper_callable):
 
 def dump_object(value, args):
     """
-    Serializes a non callable variable
+    Serializes a non callable variable using the first matching dumper in
+    :data:`OBJECT_DUMPERS`. Values without matching dumper are returned as
+    is.
 
     Examples::
         >>> dump_object(datetime(2000, 11, 11))
         "2000-11-11 00:00:00Z"
     """
-    #print value, args
-    for class_ in OBJECT_DUMPERS:
-        if isinstance(class_, basestring):
-            if class_ == value.__class__.__name__:
-                value = OBJECT_DUMPERS[class_](value, args)
-        elif isinstance(value, class_):
-            value = OBJECT_DUMPERS[class_](value, args)
-    return value
+    dumper = resolve_dumper(value, args)
+    if dumper is None:
+        return value
+    return dumper(value, args)
+
+
+def resolve_dumper(value, args):
+    """
+    Returns the dumper for given value, or None if the value is left
+    untouched. The dumper declared for a schema field in `args` takes
+    precedence over :data:`OBJECT_DUMPERS` for values other than None.
+    """
+    dumper = getattr(args, 'dumper', empty)
+    if dumper is empty or value is None or value is empty:
+        return OBJECT_DUMPERS.resolve(type(value))
+    return dumper
 
 
 def copy_args(args):
@@ -385,13 +1313,20 @@ def cleanup(serialized):
         >>> User(id=1, name='someone').as_json()
         {'id': 1, 'name': 'Someone'}
     """
-    return dict(filter(lambda a: a[1] is not empty, serialized.items()))
+    return dict(
+        (key, value) for key, value in serialized.items()
+        if value is not empty
+    )
 
 
 def serialize_iterable(serializable, iterable, exclude=None):
     """
     serialize iterable
 
+    Kept for backwards compatibility, :func:`serialize` uses compiled
+    :class:`SerializationPlan` objects instead. Unlike the plans this
+    returns the :data:`empty` values as well, see :func:`cleanup`.
+
     :param serializable: serializable obj of which the iterable belong to
     :param iterable: attributes as iterable
     :param exclude: excluded attributes
@@ -427,12 +1362,14 @@ def serialize_attribute(obj, attr, args=None):
     """
     if not args:
         args = {}
+    return dumps(getattr(obj, attr, empty), args)
 
-    if not hasattr(obj, attr):
-        value = empty
-    else:
-        value = getattr(obj, attr)
-
-    value = dumps(value, args)
 
-    return value
+from .aio import serialize_async, serialize_many_async  # noqa
+from .backends import get_json_backend, set_json_backend  # noqa
+from .codegen import disable_codegen, enable_codegen, specialize  # noqa
+from .formats import register_format, to_format  # noqa
+from .iterative import SerializationDepthError, serialize_iterative  # noqa
+from .schema import Field, Schema  # noqa
+from .stream import dump_json, iterencode_json  # noqa
+from .xmlwriter import dump_xml, dumps_xml  # noqa
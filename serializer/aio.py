@@ -0,0 +1,137 @@
+"""
+Asyncio support for serializing objects with awaitable attributes.
+
+Attributes whose value (or whose method's return value) is awaitable, such
+as lazily loaded associations exposed as coroutines, are awaited. All
+awaitable attributes of an object and of its nested objects are awaited
+concurrently with asyncio.gather.
+
+Within a :func:`serializer.memoize` block awaitable results of methods are
+memoized as tasks, so that each method is awaited at most once per object.
+"""
+import asyncio
+import inspect
+
+from serializer import (
+    call_attribute,
+    compile_plan,
+    dump_list,
+    dump_object,
+    dump_serializable,
+    empty,
+    is_callable,
+    nested_plan,
+    resolve_dumper,
+)
+
+
+async def serialize_async(serializable, only=None, exclude=None,
+                          include=None):
+    """
+    Asynchronous version of :func:`serializer.serialize`.
+
+    Examples::
+
+        >>> class User(Serializable):
+        ...     def attributes(self):
+        ...         return ['name', 'posts']
+        ...
+        ...     async def posts(self):
+        ...         return await load_posts(self.id)
+        ...
+        >>> await serialize_async(user)
+        {'name': 'John', 'posts': [{'title': 'First post'}]}
+    """
+    plan = compile_plan(
+        serializable, only=only, exclude=exclude, include=include
+    )
+    return await run_plan_async(plan, serializable)
+
+
+async def serialize_many_async(objects, only=None, exclude=None,
+                               include=None):
+    """
+    Asynchronous version of :func:`serializer.serialize_many`. The objects
+    are serialized concurrently.
+    """
+    plans = {}
+    coroutines = []
+    for obj in objects:
+        try:
+            plan = plans[type(obj)]
+        except KeyError:
+            plan = plans[type(obj)] = compile_plan(
+                obj, only=only, exclude=exclude, include=include
+            )
+        coroutines.append(run_plan_async(plan, obj))
+    return list(await asyncio.gather(*coroutines))
+
+
+def share_awaitable(value):
+    """
+    Wraps given awaitable into a task. Memoized results of method valued
+    attributes may be awaited more than once, which a coroutine does not
+    allow.
+    """
+    if inspect.isawaitable(value):
+        return asyncio.ensure_future(value)
+    return value
+
+
+def needs_async(value, args=None):
+    """
+    Returns whether or not given attribute value has to be dumped with
+    :func:`dump_async`
+    """
+    if inspect.isawaitable(value):
+        return True
+    dumper = resolve_dumper(value, args)
+    return dumper is dump_serializable or dumper is dump_list
+
+
+async def run_plan_async(plan, serializable):
+    """
+    Applies given serialization plan to given object, awaiting awaitable
+    attribute values concurrently
+    """
+    values = []
+    pending = []
+    for attr, alias, args in plan.steps:
+        value = getattr(serializable, attr, empty)
+        if is_callable(value):
+            value = call_attribute(value, wrap=share_awaitable)
+        if needs_async(value, args):
+            pending.append((len(values), dump_async(value, args)))
+        else:
+            value = dump_object(value, args)
+        values.append(value)
+    if pending:
+        results = await asyncio.gather(*[item[1] for item in pending])
+        for (index, coroutine), result in zip(pending, results):
+            values[index] = result
+
+    serialized = {}
+    for (attr, alias, args), value in zip(plan.steps, values):
+        if value is empty:
+            serialized.pop(alias, None)
+        else:
+            serialized[alias] = value
+    return serialized
+
+
+async def dump_async(value, args):
+    """
+    Asynchronous version of :func:`serializer.dumps`
+    """
+    if inspect.isawaitable(value):
+        value = await value
+    if is_callable(value):
+        value = call_attribute(value, wrap=share_awaitable)
+    dumper = resolve_dumper(value, args)
+    if dumper is dump_serializable:
+        return await run_plan_async(nested_plan(value, args), value)
+    if dumper is dump_list:
+        return list(await asyncio.gather(
+            *[dump_async(item, args) for item in value]
+        ))
+    return dump_object(value, args)
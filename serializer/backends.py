@@ -0,0 +1,286 @@
+"""
+Pluggable JSON encoder backends.
+
+Each backend adapts one JSON library to the same small interface:
+``dumps(value, **options)`` returning a string and ``dumpb(value,
+**options)`` returning UTF-8 encoded bytes. The options are the keyword
+arguments understood by the standard library json.dumps (sort_keys,
+separators, indent, ...) plus ``use_decimal``.
+
+Decimal values are never silently rounded: simplejson encodes them as exact
+JSON numbers, the other backends, whose libraries have no decimal support,
+as strings. With ``use_decimal=False`` all backends encode them as floats.
+
+All backends encode the other values the serialized structure may still
+contain in the same way:
+
+- datetime and date values and any other values with a registered dumper are
+  dumped with :func:`serializer.dump_object`
+- :data:`serializer.empty` is encoded as null
+"""
+from decimal import Decimal
+
+from serializer import dump_object, empty
+
+
+def dump_fallback(value, format='JSON'):
+    """
+    Dumps a value the encoder of given format does not know:
+    :data:`serializer.empty` as None and other values with their registered
+    dumper. Raises TypeError for values without one.
+    """
+    if value is empty:
+        return None
+    dumped = dump_object(value, {})
+    if dumped is value:
+        raise TypeError('%r is not %s serializable' % (value, format))
+    return dumped
+
+
+def default(value):
+    """
+    Fallback encoder for values the JSON libraries do not know. Decimal
+    values are encoded as strings, so that no precision is lost.
+    """
+    if isinstance(value, Decimal):
+        return str(value)
+    return dump_fallback(value)
+
+
+def float_default(value):
+    """
+    Fallback encoder encoding Decimal values as floats
+    """
+    if isinstance(value, Decimal):
+        return float(value)
+    return default(value)
+
+
+def fallback(use_decimal):
+    """
+    Returns the fallback encoder for given use_decimal option
+    """
+    return default if use_decimal else float_default
+
+
+class JSONBackend(object):
+    """
+    Base class for JSON backends
+    """
+    #: Name of the backend in :data:`JSON_BACKENDS`
+    name = None
+
+    def dumps(self, value, **options):
+        raise NotImplementedError
+
+    def dumpb(self, value, **options):
+        return self.dumps(value, **options).encode('utf-8')
+
+    def encoder(self, use_decimal=True, **options):
+        """
+        Returns a JSONEncoder producing the same JSON as :meth:`dumps` with
+        the same options, for the streaming encoder of
+        :mod:`serializer.stream`
+        """
+        import json
+        options.setdefault('default', fallback(use_decimal))
+        return json.JSONEncoder(**options)
+
+
+class StdlibBackend(JSONBackend):
+    name = 'json'
+
+    def __init__(self):
+        import json
+        self.json = json
+
+    def dumps(self, value, use_decimal=True, **options):
+        options.setdefault('default', fallback(use_decimal))
+        return self.json.dumps(value, **options)
+
+
+class SimplejsonBackend(JSONBackend):
+    name = 'simplejson'
+
+    def __init__(self):
+        import simplejson
+        self.json = simplejson
+
+    def dumps(self, value, use_decimal=True, **options):
+        options.setdefault('default', fallback(use_decimal))
+        return self.json.dumps(value, use_decimal=use_decimal, **options)
+
+    def encoder(self, use_decimal=True, **options):
+        options.setdefault('default', fallback(use_decimal))
+        return self.json.JSONEncoder(use_decimal=use_decimal, **options)
+
+
+class OrjsonBackend(JSONBackend):
+    """
+    orjson backend. orjson always produces compact output, hence the
+    separators and ensure_ascii options are ignored and indent is only
+    supported as two spaces. Native bytes output makes :meth:`dumpb` the
+    preferred method with this backend.
+    """
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self.orjson = orjson
+
+    def dumpb(self, value, sort_keys=False, indent=None, default=None,
+              use_decimal=True, separators=None, ensure_ascii=None):
+        if default is None:
+            default = fallback(use_decimal)
+        orjson = self.orjson
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(value, default=default, option=option)
+
+    def dumps(self, value, **options):
+        return self.dumpb(value, **options).decode('utf-8')
+
+    def encoder(self, sort_keys=False, indent=None, default=None,
+                use_decimal=True, separators=None, ensure_ascii=None):
+        import json
+        if default is None:
+            default = fallback(use_decimal)
+        return json.JSONEncoder(
+            sort_keys=sort_keys,
+            indent=2 if indent else None,
+            separators=(',', ': ') if indent else (',', ':'),
+            ensure_ascii=False,
+            default=default
+        )
+
+
+def replace_decimals(value, convert):
+    """
+    Returns given value with the Decimal values nested in its dicts, lists
+    and tuples replaced by ``convert(decimal)``. Containers without decimals
+    are returned as they are instead of being copied.
+    """
+    if isinstance(value, Decimal):
+        return convert(value)
+    if isinstance(value, dict):
+        replaced = None
+        for key, item in value.items():
+            new = replace_decimals(item, convert)
+            if new is not item:
+                if replaced is None:
+                    replaced = dict(value)
+                replaced[key] = new
+        return value if replaced is None else replaced
+    if isinstance(value, (list, tuple)):
+        replaced = None
+        for index, item in enumerate(value):
+            new = replace_decimals(item, convert)
+            if new is not item:
+                if replaced is None:
+                    replaced = list(value)
+                replaced[index] = new
+        return value if replaced is None else replaced
+    return value
+
+
+class UjsonBackend(JSONBackend):
+    """
+    ujson backend. ujson encodes Decimal values itself as floats, without
+    consulting the default function, hence they are replaced before encoding.
+    """
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self.ujson = ujson
+
+    def dumps(self, value, use_decimal=True, separators=None, **options):
+        options.setdefault('default', fallback(use_decimal))
+        options.setdefault('escape_forward_slashes', False)
+        value = replace_decimals(value, str if use_decimal else float)
+        return self.ujson.dumps(value, **options)
+
+    def encoder(self, use_decimal=True, separators=None, indent=None,
+                escape_forward_slashes=False, **options):
+        import json
+        options.setdefault('default', fallback(use_decimal))
+        return json.JSONEncoder(
+            indent=indent or None,
+            separators=(',', ': ') if indent else (',', ':'),
+            **options
+        )
+
+
+#: Available backend classes by name
+JSON_BACKENDS = {
+    'json': StdlibBackend,
+    'simplejson': SimplejsonBackend,
+    'orjson': OrjsonBackend,
+    'ujson': UjsonBackend,
+}
+
+_instances = {}
+_default = [None]
+
+
+def get_json_backend(backend=None):
+    """
+    Returns a JSON backend instance.
+
+    :param backend: backend name, backend instance or None for the default
+        backend set with :func:`set_json_backend`. Without explicitly set
+        default, simplejson is used if installed and the standard library
+        json otherwise.
+    """
+    if backend is None:
+        backend = _default[0]
+        if backend is None:
+            try:
+                backend = _default[0] = get_json_backend('simplejson')
+            except ImportError:
+                backend = _default[0] = get_json_backend('json')
+        return backend
+    if isinstance(backend, JSONBackend):
+        return backend
+    try:
+        return _instances[backend]
+    except KeyError:
+        try:
+            backend_cls = JSON_BACKENDS[backend]
+        except KeyError:
+            raise ValueError('Unknown JSON backend %r' % (backend, ))
+        instance = _instances[backend] = backend_cls()
+        return instance
+
+
+def set_json_backend(backend):
+    """
+    Sets the default JSON backend
+
+    :param backend: backend name, backend instance or None for restoring the
+        automatic selection
+
+    Examples::
+
+        >>> set_json_backend('orjson')
+        >>> user.to_json(only=['name'])
+        '{"name":"John"}'
+    """
+    _default[0] = None if backend is None else get_json_backend(backend)
+
+
+def available_backends():
+    """
+    Returns the names of the backends whose JSON library is installed
+    """
+    names = []
+    for name in sorted(JSON_BACKENDS):
+        try:
+            get_json_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
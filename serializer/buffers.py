@@ -0,0 +1,201 @@
+"""
+Encoding into reusable buffers.
+
+:func:`encode_into` writes the UTF-8 encoded JSON of an object (or list of
+objects) into a caller supplied bytearray or io.BytesIO and returns a
+memoryview of the written region. :class:`BufferPool` keeps a few
+bytearrays per thread for reuse, so that high traffic endpoints do not
+allocate and free a large buffer for each response.
+
+The JSON backends can not write into a buffer, hence by default the
+document is encoded into a bytes object which is copied into the buffer
+and freed right away. With `chunk_size` the document is instead encoded in
+chunks with :func:`serializer.stream.iterencode_json`, which is slower but
+never holds the whole document, or its intermediate dictionaries, in memory
+outside the buffer.
+
+Examples::
+
+    >>> with encoded(user, only=['id', 'name']) as view:
+    ...     sock.sendall(view)
+
+    >>> buffer = bytearray()
+    >>> with encode_into(users, buffer, chunk_size=65536) as view:
+    ...     sock.sendall(view)
+
+Buffers can not be resized while a memoryview of them exists, hence the
+returned views must be released (with ``view.release()`` or a with block)
+before the buffer is written into again.
+"""
+import threading
+from contextlib import contextmanager
+from io import BytesIO
+
+from serializer import compile_args, dumps, get_json_backend
+from serializer.stream import iterencode_json
+
+
+def encode_into(value, buffer, only=None, exclude=None, include=None,
+                offset=0, backend=None, chunk_size=None, options=None,
+                **kwargs):
+    """
+    Writes given value serialized into UTF-8 encoded JSON into given buffer
+    starting at `offset` and returns a memoryview of the written bytes.
+
+    Bytearrays are extended as needed but never shrunk, so that a reused
+    buffer keeps its capacity. Bytes after the written region are left as
+    they are.
+
+    :param value: object or list of objects to be serialized
+    :param buffer: bytearray or io.BytesIO object
+    :param only: same as in :func:`serializer.serialize`
+    :param exclude: same as in :func:`serializer.serialize`
+    :param include: same as in :func:`serializer.serialize`
+    :param offset: position the JSON is written at
+    :param backend: name of the JSON backend, see :mod:`serializer.backends`
+    :param chunk_size: if given, the JSON is encoded in chunks of about this
+        many characters with the encoder of :mod:`serializer.stream`, which
+        produces the same JSON as the backend
+    :param options: :class:`serializer.SerializeOptions` object to use
+        instead of only, exclude, include, backend and encoder keyword
+        arguments
+    :param kwargs: additional keyword arguments for the JSON encoder
+    """
+    if options is not None:
+        only = options.only
+        exclude = options.exclude
+        include = options.include
+        backend = options.backend
+        kwargs = options.encoder_options
+    if chunk_size is None:
+        args = compile_args(dict(only=only, exclude=exclude, include=include))
+        chunks = [
+            get_json_backend(backend).dumpb(dumps(value, args), **kwargs)
+        ]
+    else:
+        chunks = (
+            chunk.encode('utf-8') for chunk in iterencode_json(
+                value,
+                only=only,
+                exclude=exclude,
+                include=include,
+                chunk_size=chunk_size,
+                backend=backend,
+                **kwargs
+            )
+        )
+
+    if isinstance(buffer, BytesIO):
+        buffer.seek(offset)
+        write = buffer.write
+        for chunk in chunks:
+            write(chunk)
+        return buffer.getbuffer()[offset:buffer.tell()]
+
+    if offset > len(buffer):
+        raise ValueError(
+            'Offset %d is past the end of the buffer of %d bytes' % (
+                offset, len(buffer)
+            )
+        )
+    position = offset
+    for chunk in chunks:
+        end = position + len(chunk)
+        if end <= len(buffer):
+            # Overwrite in place, no reallocation
+            buffer[position:end] = chunk
+        else:
+            buffer[position:] = chunk
+        position = end
+    return memoryview(buffer)[offset:position]
+
+
+class BufferPool(object):
+    """
+    Per thread pool of reusable bytearrays. Threads never share buffers,
+    hence acquiring and releasing requires no locking.
+
+    :param max_buffers: maximum number of idle buffers kept per thread
+    :param max_size: buffers which have grown larger than this many bytes
+        are discarded on release instead of being kept, so that a single
+        huge response does not pin its memory
+    """
+
+    def __init__(self, max_buffers=4, max_size=4 << 20):
+        self.max_buffers = max_buffers
+        self.max_size = max_size
+        self._local = threading.local()
+
+    @property
+    def idle(self):
+        """
+        List of the idle buffers of the current thread
+        """
+        try:
+            return self._local.buffers
+        except AttributeError:
+            buffers = self._local.buffers = []
+            return buffers
+
+    def acquire(self):
+        """
+        Returns an idle buffer of the current thread, or a new one if there
+        are none. The contents of a reused buffer are not cleared.
+        """
+        idle = self.idle
+        if idle:
+            return idle.pop()
+        return bytearray()
+
+    def release(self, buffer):
+        """
+        Returns given buffer into the pool of the current thread. Any
+        memoryview of the buffer must have been released.
+        """
+        idle = self.idle
+        if len(buffer) <= self.max_size and len(idle) < self.max_buffers:
+            idle.append(buffer)
+
+    @contextmanager
+    def buffer(self):
+        """
+        Context manager acquiring a buffer and releasing it on exit
+        """
+        buffer = self.acquire()
+        try:
+            yield buffer
+        finally:
+            self.release(buffer)
+
+    def clear(self):
+        """
+        Discards the idle buffers of the current thread
+        """
+        del self.idle[:]
+
+
+#: Default buffer pool used by :func:`encoded`
+POOL = BufferPool()
+
+
+@contextmanager
+def encoded(value, only=None, exclude=None, include=None, pool=None,
+            **kwargs):
+    """
+    Context manager encoding given value into a pooled buffer with
+    :func:`encode_into` and yielding the memoryview of the JSON. The view is
+    released and the buffer returned into the pool on exit, the view must
+    not be used afterwards.
+
+    :param pool: :class:`BufferPool` to use, defaults to :data:`POOL`
+    :param kwargs: additional keyword arguments for :func:`encode_into`
+    """
+    if pool is None:
+        pool = POOL
+    with pool.buffer() as buffer:
+        view = encode_into(
+            value, buffer, only=only, exclude=exclude, include=include,
+            **kwargs
+        )
+        with view:
+            yield view
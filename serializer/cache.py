@@ -0,0 +1,343 @@
+"""
+Response level serialization cache.
+
+Serialized objects are cached by class, primary key, version and
+serialization options. The version (by default the `updated_at` attribute)
+changes whenever the object changes, hence unchanged objects are served from
+the cache without walking their attributes, and changed objects are
+re-serialized automatically. Objects without version are not cached.
+
+Examples::
+
+    >>> cache = SerializationCache(MemoryBackend(maxsize=10000))
+    >>> USER = SerializeOptions(only=['id', 'name'])
+    >>> cache.dumpb(user, options=USER)
+    b'{"id": 1, "name": "John"}'
+
+Objects whose serialized form changes without a version change, for example
+because an included association changed, can be invalidated explicitly,
+for instance from an ORM event listener::
+
+    >>> @event.listens_for(Post, 'after_insert')
+    ... def invalidate_author(mapper, connection, target):
+    ...     cache.invalidate(target.author)
+"""
+import functools
+import hashlib
+import threading
+import time
+from types import ModuleType
+
+from serializer import LRUCache, SerializeOptions
+
+
+class CacheBackend(object):
+    """
+    Base class for cache backends. Keys are strings, values are either
+    bytes or serialized dictionaries.
+    """
+
+    def get(self, key):
+        """
+        Returns the value of given key or None if the key is not cached
+        """
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """
+    In-process least recently used cache
+    """
+
+    def __init__(self, maxsize=10000):
+        self.cache = LRUCache(maxsize=maxsize)
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache[key] = value
+
+    def delete(self, key):
+        self.cache.pop(key)
+
+    def clear(self):
+        self.cache.clear()
+
+
+class MappingBackend(CacheBackend):
+    """
+    Backend storing the values in a mutable mapping. With a
+    multiprocessing.Manager().dict() the cache is shared by all processes
+    using the manager. The mapping is not bounded.
+    """
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+
+    def get(self, key):
+        return self.mapping.get(key)
+
+    def set(self, key, value):
+        self.mapping[key] = value
+
+    def delete(self, key):
+        self.mapping.pop(key, None)
+
+    def clear(self):
+        self.mapping.clear()
+
+
+class ClientBackend(CacheBackend):
+    """
+    Backend for memcached and redis style clients providing
+    ``get(key)``, ``set(key, value, timeout)`` and ``delete(key)``.
+
+    The keys passed to the client are the prefix followed by the SHA-1 hex
+    digest of the cache key, as memcached does not accept keys containing
+    whitespace or longer than 250 bytes.
+
+    :param client: cache client
+    :param prefix: prefix added to all keys
+    :param timeout: expiration time of the cached values in seconds
+    """
+
+    def __init__(self, client, prefix='serializer:', timeout=None):
+        self.client = client
+        self.prefix = prefix
+        self.timeout = timeout
+        self.keys = set()
+
+    def client_key(self, key):
+        """
+        Returns the key passed to the client for given cache key
+        """
+        return self.prefix + hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        return self.client.get(self.client_key(key))
+
+    def set(self, key, value):
+        self.keys.add(key)
+        self.client.set(self.client_key(key), value, self.timeout)
+
+    def delete(self, key):
+        self.keys.discard(key)
+        self.client.delete(self.client_key(key))
+
+    def clear(self):
+        # Only the keys set through this backend can be cleared
+        for key in list(self.keys):
+            self.delete(key)
+
+
+class LocalClient(object):
+    """
+    In-process stand-in for an external cache client, for development and
+    tests. Values are copied on set, like they would be by a real client.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            try:
+                value, expires = self.data[key]
+            except KeyError:
+                return None
+            if expires is not None and expires <= time.time():
+                del self.data[key]
+                return None
+            return value
+
+    def set(self, key, value, timeout=None):
+        if isinstance(value, bytearray):
+            value = bytes(value)
+        with self.lock:
+            self.data[key] = (
+                value, None if timeout is None else time.time() + timeout
+            )
+
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+
+def stable_repr(value):
+    """
+    Returns a representation of given options value for computing cache
+    keys. Set and dict items are sorted, functions and classes defined at
+    module level are represented by their qualified names and partials by
+    their function and arguments, hence such values are represented the same
+    in every process.
+
+    Lambdas, nested functions, bound methods of objects and objects without
+    a repr of their own are represented by identity, as their names do not
+    tell them apart. Their keys are therefore not shared across processes.
+    """
+    if isinstance(value, (list, tuple)):
+        return '(%s)' % ', '.join(stable_repr(item) for item in value)
+    if isinstance(value, dict):
+        return '{%s}' % ', '.join(sorted(
+            '%s: %s' % (stable_repr(key), stable_repr(item))
+            for key, item in value.items()
+        ))
+    if isinstance(value, (set, frozenset)):
+        return '{%s}' % ', '.join(sorted(stable_repr(item) for item in value))
+    if isinstance(value, functools.partial):
+        return 'functools.partial(%s)' % ', '.join(
+            [stable_repr(value.func)] +
+            [stable_repr(arg) for arg in value.args] +
+            [
+                '%s=%s' % (key, stable_repr(arg))
+                for key, arg in sorted(value.keywords.items())
+            ]
+        )
+    if hasattr(value, '__qualname__'):
+        name = '%s.%s' % (value.__module__, value.__qualname__)
+        bound_to = getattr(value, '__self__', None)
+        if bound_to is not None and not isinstance(bound_to, ModuleType):
+            return '%s of %s' % (name, stable_repr(bound_to))
+        if '<' in value.__qualname__:
+            # <lambda> and <locals>
+            return '%s at %#x' % (name, id(value))
+        return name
+    return repr(value)
+
+
+def default_pk(obj):
+    return getattr(obj, 'id', None)
+
+
+def default_version(obj):
+    return getattr(obj, 'updated_at', None)
+
+
+class SerializationCache(object):
+    """
+    Serialization cache in front of :meth:`serializer.Serializable.as_json`
+    and :meth:`serializer.Serializable.to_json`.
+
+    :param backend: :class:`CacheBackend` instance
+    :param pk: function returning the primary key of given object
+    :param version: function returning the version of given object, objects
+        whose version is None are not cached
+    """
+
+    def __init__(self, backend=None, pk=default_pk, version=default_version):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.pk = pk
+        self.version = version
+        self.option_keys = set()
+        self._options_keys = {}
+        self.hits = 0
+        self.misses = 0
+
+    def options_key(self, options):
+        """
+        Returns a key for given options which is stable across processes.
+        The key is computed once per distinct options.
+        """
+        try:
+            return self._options_keys[options]
+        except KeyError:
+            pass
+        key = hashlib.sha1(stable_repr((
+            options.spec_key,
+            options.backend,
+            options.encoder_options
+        )).encode('utf-8')).hexdigest()
+        self._options_keys[options] = key
+        self.option_keys.add(key)
+        return key
+
+    def key(self, obj, options_key, kind):
+        """
+        Returns the cache key of given object, or None if the object can not
+        be cached
+        """
+        pk = self.pk(obj)
+        if pk is None:
+            return None
+        version = self.version(obj)
+        if version is None:
+            return None
+        return '%s.%s:%s:%s:%s:%s' % (
+            type(obj).__module__,
+            type(obj).__name__,
+            pk,
+            kind,
+            options_key,
+            version
+        )
+
+    def _cached(self, obj, options, kind, serialize):
+        key = self.key(obj, self.options_key(options), kind)
+        if key is None:
+            return serialize(obj)
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            value = serialize(obj)
+            self.backend.set(key, value)
+        else:
+            self.hits += 1
+        return value
+
+    def as_json(self, obj, only=None, exclude=None, include=None,
+                options=None):
+        """
+        Returns the serialized dictionary of given object. The returned
+        dictionary may be shared by other callers and must not be modified.
+        """
+        if options is None:
+            options = SerializeOptions(
+                only=only, exclude=exclude, include=include
+            )
+        return self._cached(obj, options, 'dict', options.serialize)
+
+    def dumpb(self, obj, only=None, exclude=None, include=None,
+              options=None):
+        """
+        Returns given object serialized into UTF-8 encoded JSON bytes
+        """
+        if options is None:
+            options = SerializeOptions(
+                only=only, exclude=exclude, include=include
+            )
+        return self._cached(obj, options, 'json', options.dumpb)
+
+    def to_json(self, obj, only=None, exclude=None, include=None,
+                options=None):
+        """
+        Returns given object serialized into a JSON string
+        """
+        return self.dumpb(
+            obj, only=only, exclude=exclude, include=include, options=options
+        ).decode('utf-8')
+
+    def invalidate(self, obj):
+        """
+        Removes the cached serializations of the current version of given
+        object for all options used through this cache. Entries of older
+        versions are never read again and are left to be evicted.
+        """
+        for options_key in list(self.option_keys):
+            for kind in ('dict', 'json'):
+                key = self.key(obj, options_key, kind)
+                if key is not None:
+                    self.backend.delete(key)
+
+    def clear(self):
+        self.backend.clear()
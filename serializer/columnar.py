@@ -0,0 +1,142 @@
+"""
+Compact tabular output for lists of objects.
+
+Instead of one dictionary per object, which repeats every key, the objects
+are serialized into either a row-major table::
+
+    {"columns": ["id", "name"], "rows": [[1, "John"], [2, "Jack"]]}
+
+or column-major arrays::
+
+    {"id": [1, 2], "name": ["John", "Jack"]}
+
+The columns are the aliases of the attributes selected by the usual only /
+exclude / include spec. Nested objects and lists are serialized as usual.
+Values which are :data:`serializer.empty` are written as `missing` (None by
+default), since a table can not leave a cell out.
+"""
+from serializer import compile_plan, dumps, empty, freeze_spec_key
+
+
+def _iter_rows(objects, only, exclude, include, missing):
+    """
+    Yields the column list and the rows of given objects. The column list is
+    extended in place when an object of another class adds new columns.
+    """
+    try:
+        spec_key = freeze_spec_key(only, exclude, include)
+        hash(spec_key)
+    except TypeError:
+        spec_key = None
+    columns = []
+    positions = {}
+    layouts = {}
+    for obj in objects:
+        try:
+            steps, indexes = layouts[type(obj)]
+        except KeyError:
+            steps = compile_plan(
+                obj,
+                only=only,
+                exclude=exclude,
+                include=include,
+                spec_key=spec_key
+            ).unique_steps
+            indexes = []
+            for step in steps:
+                if step[1] not in positions:
+                    positions[step[1]] = len(columns)
+                    columns.append(step[1])
+                indexes.append(positions[step[1]])
+            layouts[type(obj)] = steps, indexes
+        row = [missing] * len(columns)
+        for (attr, alias, args), index in zip(steps, indexes):
+            value = dumps(getattr(obj, attr, empty), args)
+            if value is not empty:
+                row[index] = value
+        yield columns, row
+
+
+def serialize_rows(objects, only=None, exclude=None, include=None,
+                   missing=None):
+    """
+    Serializes given objects into a row-major table.
+
+    Examples::
+
+        >>> serialize_rows(users, only=['id', 'name'])
+        {'columns': ['id', 'name'], 'rows': [[1, 'John'], [2, 'Jack']]}
+
+    :param objects: iterable of objects to be serialized
+    :param only: same as in :func:`serializer.serialize`
+    :param exclude: same as in :func:`serializer.serialize`
+    :param include: same as in :func:`serializer.serialize`
+    :param missing: value written for missing and empty values
+    """
+    columns = []
+    rows = []
+    for columns, row in _iter_rows(objects, only, exclude, include, missing):
+        rows.append(row)
+    width = len(columns)
+    for row in rows:
+        if len(row) < width:
+            row.extend([missing] * (width - len(row)))
+    return {'columns': list(columns), 'rows': rows}
+
+
+def serialize_columns(objects, only=None, exclude=None, include=None,
+                      missing=None):
+    """
+    Serializes given objects into column-major arrays, one array per
+    attribute alias. See :func:`serialize_rows` for the parameters.
+
+    Examples::
+
+        >>> serialize_columns(users, only=['id', 'name'])
+        {'id': [1, 2], 'name': ['John', 'Jack']}
+    """
+    table = serialize_rows(
+        objects, only=only, exclude=exclude, include=include, missing=missing
+    )
+    return dict(
+        (column, [row[index] for row in table['rows']])
+        for index, column in enumerate(table['columns'])
+    )
+
+
+def inflate(table, missing=None, drop_missing=False):
+    """
+    Converts a table returned by :func:`serialize_rows` or
+    :func:`serialize_columns` back into a list of dictionaries.
+
+    A table can not tell a missing value from a real value equal to
+    `missing`, hence with `drop_missing` and the default `missing` of None,
+    keys whose value really is None are left out as well. Pass the same
+    distinct `missing` value to both functions to keep them::
+
+        >>> inflate(serialize_rows(users, missing='-'), missing='-',
+        ...         drop_missing=True)
+
+    :param table: row-major or column-major table
+    :param missing: the value used for missing values when serializing
+    :param drop_missing: whether or not to leave out keys whose value equals
+        `missing`, reproducing the output of :func:`serializer.serialize`
+        for empty values
+    """
+    if set(table) == set(['columns', 'rows']) and (
+        not table['rows'] or isinstance(table['rows'][0], list)
+    ):
+        columns = table['columns']
+        rows = table['rows']
+    else:
+        columns = list(table)
+        rows = zip(*[table[column] for column in columns])
+    if not drop_missing:
+        return [dict(zip(columns, row)) for row in rows]
+    return [
+        dict(
+            (column, value) for column, value in zip(columns, row)
+            if value != missing
+        )
+        for row in rows
+    ]
@@ -0,0 +1,212 @@
+"""
+Bulk export of serialized objects in JSON Lines (NDJSON) format.
+
+Objects are serialized one at a time and written one per line through a
+fixed size buffer, optionally compressed on the fly with gzip or zlib,
+hence exports of any size run in constant memory.
+
+Examples::
+
+    >>> stats = export_ndjson(
+    ...     session.query(User).yield_per(1000),
+    ...     'users.ndjson.gz',
+    ...     only=['id', 'name'],
+    ...     compression='gzip',
+    ...     progress=lambda stats: print(stats),
+    ... )
+    >>> stats.objects
+    1000000
+"""
+import gzip
+import os
+import time
+import zlib
+
+from serializer import (
+    SerializeOptions,
+    compile_plan,
+    get_json_backend,
+    run_plan,
+)
+
+
+timer = time.perf_counter
+
+
+#: Supported compression formats
+COMPRESSIONS = (None, 'gzip', 'zlib')
+
+
+class ExportStats(object):
+    """
+    Progress and throughput counters of an export
+
+    :ivar objects: number of objects written
+    :ivar bytes: number of uncompressed bytes of the serialized objects
+    :ivar compressed_bytes: number of bytes written to the target. During
+        the export it lags behind bytes by the data still buffered, once the
+        export is finished it equals bytes if no compression is used.
+    :ivar elapsed: seconds elapsed since the export started
+    """
+
+    def __init__(self):
+        self.objects = 0
+        self.bytes = 0
+        self.compressed_bytes = 0
+        self.elapsed = 0.0
+
+    @property
+    def objects_per_second(self):
+        return self.objects / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (
+            '<ExportStats objects=%d bytes=%d compressed_bytes=%d '
+            'elapsed=%.2fs objects/s=%.0f>'
+        ) % (
+            self.objects,
+            self.bytes,
+            self.compressed_bytes,
+            self.elapsed,
+            self.objects_per_second
+        )
+
+
+class CountingWriter(object):
+    """
+    Binary file-like wrapper counting the bytes written into given file
+    """
+
+    def __init__(self, fp, stats):
+        self.fp = fp
+        self.stats = stats
+
+    def write(self, data):
+        self.stats.compressed_bytes += len(data)
+        return self.fp.write(data)
+
+    def flush(self):
+        self.fp.flush()
+
+
+class ZlibWriter(object):
+    """
+    Binary file-like object compressing the written data with zlib
+    """
+
+    def __init__(self, fp, level):
+        self.fp = fp
+        self.compressor = zlib.compressobj(level)
+
+    def write(self, data):
+        compressed = self.compressor.compress(data)
+        if compressed:
+            self.fp.write(compressed)
+
+    def close(self):
+        self.fp.write(self.compressor.flush())
+
+
+def export_ndjson(objects, target, only=None, exclude=None, include=None,
+                  compression=None, compresslevel=6, buffer_size=1 << 20,
+                  progress=None, progress_every=10000, options=None):
+    """
+    Writes given objects serialized into JSON, one object per line, into
+    given target and returns the :class:`ExportStats` of the export.
+
+    :param objects: iterable of serializable objects, consumed lazily
+    :param target: path or binary file-like object. A file opened from a
+        path is closed when the export is finished, a file-like object is
+        only flushed.
+    :param only: same as in :func:`serializer.serialize`
+    :param exclude: same as in :func:`serializer.serialize`
+    :param include: same as in :func:`serializer.serialize`
+    :param compression: None, 'gzip' or 'zlib'
+    :param compresslevel: compression level from 0 to 9
+    :param buffer_size: number of bytes buffered before writing
+    :param progress: function called with the :class:`ExportStats` every
+        `progress_every` objects and once the export is finished, unless the
+        last call already reported all objects
+    :param progress_every: number of objects between progress calls
+    :param options: :class:`serializer.SerializeOptions` object to use
+        instead of only, exclude and include. Its backend and encoder
+        options are used for encoding, indent is not supported.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError('Unknown compression %r' % (compression, ))
+    if options is None:
+        options = SerializeOptions(only=only, exclude=exclude, include=include)
+    if options.encoder_options.get('indent') is not None:
+        raise ValueError('JSON Lines can not be indented')
+
+    stats = ExportStats()
+    start = timer()
+    if isinstance(target, (str, bytes, os.PathLike)):
+        fp = open(target, 'wb')
+        owns_file = True
+    else:
+        fp = target
+        owns_file = False
+    try:
+        raw = CountingWriter(fp, stats)
+        if compression == 'gzip':
+            writer = gzip.GzipFile(
+                fileobj=raw, mode='wb', compresslevel=compresslevel
+            )
+        elif compression == 'zlib':
+            writer = ZlibWriter(raw, compresslevel)
+        else:
+            writer = raw
+
+        _write_lines(objects, writer, options, buffer_size, stats, start,
+                     progress, progress_every)
+
+        if writer is not raw:
+            writer.close()
+        raw.flush()
+    finally:
+        if owns_file:
+            fp.close()
+    stats.elapsed = timer() - start
+    if progress is not None and (
+        not stats.objects or stats.objects % progress_every
+    ):
+        progress(stats)
+    return stats
+
+
+def _write_lines(objects, writer, options, buffer_size, stats, start,
+                 progress, progress_every):
+    dumpb = get_json_backend(options.backend).dumpb
+    encoder_options = options.encoder_options
+    spec = options.spec
+    spec_key = options.spec_key
+    plans = {}
+    buffer = bytearray()
+    count = 0
+    for obj in objects:
+        try:
+            plan = plans[type(obj)]
+        except KeyError:
+            plan = plans[type(obj)] = compile_plan(
+                obj, spec_key=spec_key, **spec
+            )
+        line = dumpb(run_plan(plan, obj), **encoder_options)
+        buffer += line
+        buffer += b'\n'
+        stats.bytes += len(line) + 1
+        count += 1
+        if len(buffer) >= buffer_size:
+            writer.write(buffer)
+            del buffer[:]
+        if progress is not None and count % progress_every == 0:
+            stats.objects = count
+            stats.elapsed = timer() - start
+            progress(stats)
+    if buffer:
+        writer.write(buffer)
+    stats.objects = count
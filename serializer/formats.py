@@ -0,0 +1,198 @@
+"""
+Output format registry and binary output formats.
+
+Formats are functions taking the object to serialize, the only / exclude /
+include spec and format specific keyword arguments, and returning the
+encoded output. Besides JSON and XML, MessagePack (requires msgpack) and
+CBOR (requires cbor2) are available.
+
+The binary formats encode datetime, date and Decimal values natively
+instead of converting them to strings with the dumpers in
+:data:`serializer.OBJECT_DUMPERS`:
+
+- CBOR encodes all of them with their standard tags
+- MessagePack encodes datetimes with the timestamp extension type and, as
+  it has no date or decimal types, dates as ISO 8601 strings and Decimals as
+  strings
+
+Naive datetimes are considered to be in UTC. Other values the encoders do
+not know, such as values inside raw dictionaries and lists, are encoded like
+the JSON backends encode them: :data:`serializer.empty` as nil / null and
+values with a registered dumper with that dumper.
+"""
+from datetime import date, datetime, timedelta, tzinfo
+from decimal import Decimal
+
+from serializer import (
+    OBJECT_DUMPERS,
+    call_attribute,
+    compile_args,
+    dump_list,
+    dump_serializable,
+    empty,
+    is_callable,
+    nested_plan,
+    resolve_dumper,
+)
+from serializer.backends import dump_fallback
+
+
+#: Types left untouched by :func:`serialize_native`
+NATIVE_TYPES = frozenset([datetime, date, Decimal])
+
+
+class UTC(tzinfo):
+    def utcoffset(self, dt):
+        return timedelta(0)
+
+    def tzname(self, dt):
+        return 'UTC'
+
+    def dst(self, dt):
+        return timedelta(0)
+
+
+utc = UTC()
+
+
+def serialize_native(value, only=None, exclude=None, include=None,
+                     native_types=NATIVE_TYPES):
+    """
+    Serializes given object (or list of objects) like
+    :func:`serializer.serialize` but leaves the values whose type is in
+    `native_types` untouched, for formats which can encode them natively.
+    """
+    args = compile_args(dict(only=only, exclude=exclude, include=include))
+    return native_value(value, args, native_types)
+
+
+def native_value(value, args, native_types):
+    if is_callable(value):
+        value = call_attribute(value)
+    dumper = resolve_dumper(value, args)
+    if (type(value) in native_types and
+            dumper is OBJECT_DUMPERS.resolve(type(value))):
+        # Only dumpers declared for schema fields override native encoding
+        return value
+    if dumper is dump_serializable:
+        return native_object(value, args, native_types)
+    if dumper is dump_list:
+        return [native_value(item, args, native_types) for item in value]
+    if dumper is None:
+        return value
+    return dumper(value, args)
+
+
+def native_object(serializable, args, native_types):
+    plan = nested_plan(serializable, args)
+    serialized = {}
+    for attr, alias, step_args in plan.steps:
+        value = native_value(
+            getattr(serializable, attr, empty), step_args, native_types
+        )
+        if value is empty:
+            serialized.pop(alias, None)
+        else:
+            serialized[alias] = value
+    return serialized
+
+
+def msgpack_default(value):
+    import msgpack
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=utc)
+        return msgpack.Timestamp.from_datetime(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return dump_fallback(value, 'MessagePack')
+
+
+def cbor_default(encoder, value):
+    encoder.encode(dump_fallback(value, 'CBOR'))
+
+
+def to_msgpack(serializable, only=None, exclude=None, include=None,
+               **kwargs):
+    """
+    Returns given object serialized in MessagePack format
+
+    :param kwargs: additional keyword arguments passed to msgpack.packb
+    """
+    import msgpack
+    kwargs.setdefault('default', msgpack_default)
+    return msgpack.packb(
+        serialize_native(
+            serializable, only=only, exclude=exclude, include=include
+        ),
+        **kwargs
+    )
+
+
+def to_cbor(serializable, only=None, exclude=None, include=None, **kwargs):
+    """
+    Returns given object serialized in CBOR format
+
+    :param kwargs: additional keyword arguments passed to cbor2.dumps
+    """
+    import cbor2
+    kwargs.setdefault('timezone', utc)
+    kwargs.setdefault('default', cbor_default)
+    return cbor2.dumps(
+        serialize_native(
+            serializable, only=only, exclude=exclude, include=include
+        ),
+        **kwargs
+    )
+
+
+def to_json(serializable, only=None, exclude=None, include=None, **kwargs):
+    return serializable.to_json(
+        only=only, exclude=exclude, include=include, **kwargs
+    )
+
+
+def to_xml(serializable, only=None, exclude=None, include=None, **kwargs):
+    return serializable.to_xml(
+        only=only, exclude=exclude, include=include, **kwargs
+    )
+
+
+#: Registered output formats by name
+FORMATS = {
+    'json': to_json,
+    'xml': to_xml,
+    'msgpack': to_msgpack,
+    'cbor': to_cbor,
+}
+
+
+def register_format(name, writer):
+    """
+    Registers new output format
+
+    :param name: name of the format
+    :param writer: function taking the object to serialize, the only,
+        exclude and include arguments and format specific keyword arguments,
+        and returning the encoded output
+    """
+    FORMATS[name] = writer
+
+
+def to_format(serializable, name, only=None, exclude=None, include=None,
+              **kwargs):
+    """
+    Returns given object serialized in the format registered with given name
+
+    Examples::
+
+        >>> to_format(user, 'msgpack', only=['name'])
+        b'\\x81\\xa4name\\xa4John'
+    """
+    if not isinstance(name, str) or name not in FORMATS:
+        raise ValueError('Unknown format %r' % (name, ))
+    return FORMATS[name](
+        serializable, only=only, exclude=exclude, include=include, **kwargs
+    )
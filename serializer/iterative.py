@@ -0,0 +1,165 @@
+"""
+Iterative serialization engine for deep object graphs.
+
+:func:`serializer.serialize` recurses several Python frames per nesting
+level and hence hits the recursion limit on deep graphs such as threaded
+comments or org charts. :func:`serialize_iterative` walks the object graph
+with an explicit stack instead and produces identical output. The nesting
+depth is limited only by memory, or by the optional `max_depth`.
+
+Within a :func:`serializer.track_identity` block the recursive engine is
+used, since identity tracking works per plan execution.
+"""
+from serializer import (
+    _identity,
+    call_attribute,
+    compile_args,
+    dump_list,
+    dump_serializable,
+    dumps,
+    empty,
+    is_callable,
+    nested_plan,
+    resolve_dumper,
+)
+
+
+class SerializationDepthError(ValueError):
+    """
+    Raised by :func:`serialize_iterative` when the object graph is nested
+    deeper than the given max depth
+    """
+
+
+class ObjectFrame(object):
+    __slots__ = ('steps', 'index', 'obj', 'serialized', 'alias', 'depth')
+
+    def __init__(self, steps, obj, depth):
+        self.steps = steps
+        self.index = 0
+        self.obj = obj
+        self.serialized = {}
+        self.alias = None
+        self.depth = depth
+
+
+class ListFrame(object):
+    __slots__ = ('iterator', 'args', 'dumped', 'depth')
+
+    def __init__(self, values, args, depth):
+        self.iterator = iter(values)
+        self.args = args
+        self.dumped = []
+        self.depth = depth
+
+
+def serialize_iterative(value, only=None, exclude=None, include=None,
+                        max_depth=None):
+    """
+    Serializes given object (or list of objects) like
+    :func:`serializer.serialize` without recursion.
+
+    Examples::
+
+        >>> serialize_iterative(
+        ...     comment,
+        ...     only=['body', ('replies', {...})],
+        ...     max_depth=100
+        ... )
+
+    :param value: object or list of objects to be serialized
+    :param only: same as in :func:`serializer.serialize`
+    :param exclude: same as in :func:`serializer.serialize`
+    :param include: same as in :func:`serializer.serialize`
+    :param max_depth: maximum number of nested object levels, the given
+        object being the first level. :class:`SerializationDepthError` is
+        raised for deeper graphs.
+    """
+    args = compile_args(dict(only=only, exclude=exclude, include=include))
+    return walk(value, args, max_depth)
+
+
+def walk(value, args, max_depth=None):
+    """
+    Dumps given value with given attribute args using an explicit stack of
+    :class:`ObjectFrame` and :class:`ListFrame` objects
+    """
+    if _identity.get() is not None:
+        return dumps(value, args)
+    if is_callable(value):
+        value = call_attribute(value)
+    dumper = resolve_dumper(value, args)
+    if dumper is not dump_serializable and dumper is not dump_list:
+        return value if dumper is None else dumper(value, args)
+
+    stack = []
+
+    def push(value, args, dumper, depth):
+        if dumper is dump_list:
+            stack.append(ListFrame(value, args, depth))
+            return
+        depth += 1
+        if max_depth is not None and depth > max_depth:
+            raise SerializationDepthError(
+                'Maximum depth of %d exceeded while serializing %r' % (
+                    max_depth, value
+                )
+            )
+        stack.append(
+            ObjectFrame(nested_plan(value, args).steps, value, depth)
+        )
+
+    push(value, args, dumper, 0)
+    while True:
+        frame = stack[-1]
+        if type(frame) is ObjectFrame:
+            steps = frame.steps
+            serialized = frame.serialized
+            while frame.index < len(steps):
+                attr, alias, step_args = steps[frame.index]
+                frame.index += 1
+                value = getattr(frame.obj, attr, empty)
+                if is_callable(value):
+                    value = call_attribute(value)
+                dumper = resolve_dumper(value, step_args)
+                if dumper is dump_serializable or dumper is dump_list:
+                    frame.alias = alias
+                    push(value, step_args, dumper, frame.depth)
+                    break
+                if dumper is not None:
+                    value = dumper(value, step_args)
+                if value is empty:
+                    serialized.pop(alias, None)
+                else:
+                    serialized[alias] = value
+            else:
+                result = serialized
+            if stack[-1] is not frame:
+                continue
+        else:
+            args = frame.args
+            append = frame.dumped.append
+            for value in frame.iterator:
+                if is_callable(value):
+                    value = call_attribute(value)
+                dumper = resolve_dumper(value, args)
+                if dumper is dump_serializable or dumper is dump_list:
+                    push(value, args, dumper, frame.depth)
+                    break
+                if dumper is not None:
+                    value = dumper(value, args)
+                append(value)
+            else:
+                result = frame.dumped
+            if stack[-1] is not frame:
+                continue
+
+        # The frame is finished, hand its result over to the parent frame
+        stack.pop()
+        if not stack:
+            return result
+        parent = stack[-1]
+        if type(parent) is ObjectFrame:
+            parent.serialized[parent.alias] = result
+        else:
+            parent.dumped.append(result)
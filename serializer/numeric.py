@@ -0,0 +1,207 @@
+"""
+Dumpers for NumPy and pandas values.
+
+The dumpers convert whole arrays at once with NumPy (tolist, bulk ISO 8601
+formatting of datetime64 arrays, vectorized NaN and infinity handling)
+instead of dispatching each element through
+:data:`serializer.OBJECT_DUMPERS`. They are registered with
+:func:`register_dumpers`, which requires NumPy and registers the pandas
+dumpers as well if pandas is installed:
+
+- numpy.ndarray and pandas.Series are dumped into (nested) lists
+- NumPy scalars are dumped into the corresponding Python values
+- datetime64 values are formatted like datetime and date values, NaT is
+  dumped as None
+- timedelta64 values are dumped as seconds, NaT as None
+- complex values are not supported, as JSON has no complex numbers, and
+  raise TypeError
+- pandas.DataFrame is dumped into a list of records or a dict of columns
+- pandas.Timestamp is dumped like datetime, pandas.NaT and pandas.NA as None
+
+Examples::
+
+    >>> register_dumpers(nan='null')
+    >>> serialize(measurement, only=['samples'])
+    {'samples': [0.5, None, 1.5]}
+"""
+from serializer import OBJECT_DUMPERS, dump_datetime, dump_list, dumps
+
+
+#: Policies for NaN and infinite float values
+NAN_POLICIES = ('null', 'string', 'keep', 'raise')
+#: Output forms of DataFrames
+ORIENTS = ('records', 'columns')
+
+_settings = {'nan': 'null', 'orient': 'records'}
+_registered = []
+
+
+def register_dumpers(nan='null', orient='records'):
+    """
+    Registers the NumPy dumpers, and the pandas dumpers if pandas is
+    installed.
+
+    :param nan: policy for NaN and infinite float values: 'null' dumps them
+        as None, 'string' as 'NaN', 'Infinity' and '-Infinity', 'keep'
+        leaves them as floats (which most JSON encoders write as non
+        standard NaN and Infinity literals) and 'raise' raises ValueError
+    :param orient: 'records' dumps DataFrames into a list of dicts, one per
+        row, 'columns' into a dict of column lists. The index is not
+        included.
+    """
+    import numpy
+
+    if nan not in NAN_POLICIES:
+        raise ValueError('Unknown NaN policy %r' % (nan, ))
+    if orient not in ORIENTS:
+        raise ValueError('Unknown orient %r' % (orient, ))
+    _settings['nan'] = nan
+    _settings['orient'] = orient
+
+    dumpers = [
+        (numpy.ndarray, dump_ndarray),
+        (numpy.generic, dump_numpy_scalar),
+    ]
+    try:
+        import pandas
+    except ImportError:
+        pass
+    else:
+        dumpers.extend([
+            (pandas.DataFrame, dump_dataframe),
+            (pandas.Series, dump_series),
+            (pandas.Timestamp, dump_datetime),
+            (type(pandas.NaT), dump_missing),
+            (type(pandas.NA), dump_missing),
+        ])
+    unregister_dumpers()
+    OBJECT_DUMPERS.update(dumpers)
+    _registered.extend(key for key, dumper in dumpers)
+
+
+def unregister_dumpers():
+    """
+    Removes the dumpers registered with :func:`register_dumpers`
+    """
+    for key in _registered:
+        OBJECT_DUMPERS.pop(key, None)
+    del _registered[:]
+
+
+def dump_missing(value, args):
+    return None
+
+
+def dump_ndarray(array, args):
+    """
+    Dumps given array into a (nested) list, or a single value for zero
+    dimensional arrays
+    """
+    kind = array.dtype.kind
+    if kind == 'f':
+        return dump_floats(array)
+    if kind == 'M':
+        return dump_datetimes(array)
+    if kind == 'm':
+        return dump_timedeltas(array)
+    if kind == 'c':
+        raise TypeError('Complex values can not be dumped: %r' % (array, ))
+    if kind == 'O':
+        # Arbitrary Python objects, dumped one by one
+        if array.ndim == 0:
+            return dumps(array.item(), args)
+        return dump_list(array.tolist(), args)
+    return array.tolist()
+
+
+def dump_numpy_scalar(value, args):
+    if value.dtype.kind in 'fMmc':
+        return dump_ndarray(value.__array__(), args)
+    return value.item()
+
+
+def dump_floats(array):
+    import numpy
+
+    finite = numpy.isfinite(array)
+    policy = _settings['nan']
+    if policy == 'keep' or finite.all():
+        return array.tolist()
+    if policy == 'raise':
+        raise ValueError('NaN and infinite values are not JSON compliant')
+    result = array.astype(object)
+    if policy == 'null':
+        result[~finite] = None
+    else:
+        result[numpy.isnan(array)] = 'NaN'
+        result[numpy.isposinf(array)] = 'Infinity'
+        result[numpy.isneginf(array)] = '-Infinity'
+    return result.tolist()
+
+
+def dump_datetimes(array):
+    """
+    Formats given datetime64 array like the date and datetime dumpers:
+    values with a unit of a day or longer as dates, other values as UTC
+    datetimes with second precision
+    """
+    import numpy
+
+    unit = numpy.datetime_data(array.dtype)[0]
+    if unit in ('Y', 'M', 'W', 'D', 'generic'):
+        strings = numpy.datetime_as_string(array, unit='D')
+    else:
+        strings = numpy.datetime_as_string(array, unit='s', timezone='UTC')
+    missing = numpy.isnat(array)
+    if array.ndim == 0:
+        return None if missing else str(strings)
+    if missing.any():
+        strings = strings.astype(object)
+        strings[missing] = None
+    return strings.tolist()
+
+
+def dump_timedeltas(array):
+    """
+    Converts given timedelta64 array into seconds, NaT into None
+    """
+    import numpy
+
+    seconds = array / numpy.timedelta64(1, 's')
+    missing = numpy.isnat(array)
+    if array.ndim == 0:
+        return None if missing else float(seconds)
+    if missing.any():
+        seconds = seconds.astype(object)
+        seconds[missing] = None
+    return seconds.tolist()
+
+
+def column_array(series):
+    """
+    Returns the values of given pandas Series as a NumPy array. Columns of
+    pandas extension types (such as nullable integers, strings and timezone
+    aware datetimes) and object columns are converted into object arrays
+    with None for missing values.
+    """
+    import numpy
+
+    dtype = series.dtype
+    if isinstance(dtype, numpy.dtype) and dtype.kind != 'O':
+        return series.to_numpy()
+    return series.to_numpy(dtype=object, na_value=None)
+
+
+def dump_series(series, args):
+    return dump_ndarray(column_array(series), args)
+
+
+def dump_dataframe(frame, args):
+    names = list(frame.columns)
+    columns = [
+        dump_series(frame.iloc[:, index], args)
+        for index in range(len(names))
+    ]
+    if _settings['orient'] == 'columns':
+        return dict(zip(names, columns))
+    return [dict(zip(names, row)) for row in zip(*columns)]
@@ -0,0 +1,166 @@
+"""
+SQLAlchemy integration. Requires SQLAlchemy 1.4 or later.
+
+Serializing ORM objects attribute by attribute triggers a lazy load for
+each relationship of each object. :func:`loader_options` inspects an only /
+exclude / include spec and returns the query options loading exactly what
+the serialization needs up front:
+
+- the columns of each serialized class are restricted with load_only
+- included relationships are loaded in batches with selectinload (or
+  another eager loading strategy), recursively for nested includes
+
+A list endpoint therefore costs one query per serialized relationship
+level, regardless of the number of rows.
+
+Examples::
+
+    >>> spec = dict(
+    ...     only=['id', 'name'],
+    ...     include=[('posts', {'include': [('comments', {})]})]
+    ... )
+    >>> statement = select(User).options(*loader_options(User, **spec))
+    >>> serialize_many(session.scalars(statement).all(), **spec)
+
+Attributes which are not mapped, such as methods and properties, may read
+any column, hence the columns of a class are only restricted when all of
+its serialized attributes are mapped.
+"""
+from sqlalchemy import inspect
+from sqlalchemy.orm import (
+    ColumnProperty,
+    RelationshipProperty,
+    joinedload,
+    load_only,
+    selectinload,
+    subqueryload,
+    undefer,
+)
+from sqlalchemy.orm.exc import UnmappedColumnError
+
+from serializer import compile_plan, copy_args, serialize_many
+
+
+#: Eager loading strategies for included relationships
+STRATEGIES = {
+    'selectin': selectinload,
+    'joined': joinedload,
+    'subquery': subqueryload,
+}
+
+
+def loader_options(model, only=None, exclude=None, include=None,
+                   strategy='selectin'):
+    """
+    Returns a list of loader options for loading instances of given mapped
+    class for serialization with given spec.
+
+    :param model: mapped class
+    :param only: same as in :func:`serializer.serialize`
+    :param exclude: same as in :func:`serializer.serialize`
+    :param include: same as in :func:`serializer.serialize`
+    :param strategy: eager loading strategy of the included relationships,
+        'selectin', 'joined' or 'subquery'
+    """
+    try:
+        loader = STRATEGIES[strategy]
+    except KeyError:
+        raise ValueError('Unknown loading strategy %r' % (strategy, ))
+    return _options(model, only, exclude, include, loader, ())
+
+
+def _options(model, only, exclude, include, loader, required):
+    mapper = inspect(model)
+    # The plan is compiled for a blank instance, attributes() and
+    # attribute_sets() are not expected to read the instance state.
+    plan = compile_plan(
+        mapper.class_manager.new_instance(),
+        only=only,
+        exclude=exclude,
+        include=include
+    )
+    columns = set(required) | column_keys(mapper, mapper.primary_key)
+    relationships = {}
+    restrict = True
+    for attr, alias, args in plan.steps:
+        prop = mapper.attrs.get(attr)
+        if isinstance(prop, ColumnProperty):
+            columns.add(attr)
+        elif isinstance(prop, RelationshipProperty):
+            relationships[attr] = (prop, args)
+            # Many-to-one relationships are loaded with the local foreign
+            # key values
+            columns.update(column_keys(mapper, prop.local_columns))
+        else:
+            restrict = False
+
+    options = []
+    if restrict:
+        options.append(load_only(
+            *[getattr(model, key) for key in sorted(columns)]
+        ))
+    else:
+        options.extend(
+            undefer(getattr(model, key)) for key in sorted(columns)
+            if mapper.attrs[key].deferred
+        )
+    for attr, (prop, args) in relationships.items():
+        if prop.lazy == 'dynamic':
+            continue
+        target = prop.mapper
+        option = loader(getattr(model, attr))
+        nested = _options(
+            target.class_,
+            loader=loader,
+            required=column_keys(target, prop.remote_side),
+            **_spec(args)
+        )
+        if nested:
+            option = option.options(*nested)
+        options.append(option)
+    return options
+
+
+def _spec(args):
+    spec = dict(only=None, exclude=None, include=None)
+    spec.update(copy_args(args))
+    return spec
+
+
+def column_keys(mapper, columns):
+    """
+    Returns the attribute keys of given columns of given mapper
+    """
+    keys = set()
+    for column in columns:
+        try:
+            keys.add(mapper.get_property_by_column(column).key)
+        except UnmappedColumnError:
+            # Column of another table, such as an association table
+            pass
+    return keys
+
+
+def serialize_query(session, statement, only=None, exclude=None,
+                    include=None, strategy='selectin'):
+    """
+    Executes given select statement with the loader options for given spec
+    and returns the serialized results. The statement must select a single
+    mapped class.
+
+    Examples::
+
+        >>> serialize_query(session, select(User), include=['posts'])
+        [{'id': 1, 'name': 'John', 'posts': [...]}, ...]
+    """
+    model = statement.column_descriptions[0]['entity']
+    objects = session.scalars(statement.options(*loader_options(
+        model,
+        only=only,
+        exclude=exclude,
+        include=include,
+        strategy=strategy
+    ))).all()
+    return serialize_many(
+        objects, only=only, exclude=exclude, include=include
+    )
@@ -0,0 +1,140 @@
+"""
+Parallel serialization of large collections.
+
+The input is split into chunks which are serialized with
+:func:`serializer.serialize_many` in a process pool (or a thread pool for
+collections whose computed attributes are I/O bound). With a process pool
+the objects must be picklable; the serialization options are sent to each
+worker process once when the worker starts, not along with every chunk.
+"""
+import os
+from collections import deque
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from functools import partial
+from itertools import islice
+
+from serializer import SerializeOptions
+
+
+_worker_options = [None]
+
+
+def _init_worker(options):
+    _worker_options[0] = options
+
+
+def _serialize_chunk(chunk, options=None):
+    if options is None:
+        options = _worker_options[0]
+    return options.serialize_many(chunk)
+
+
+def chunked(iterable, size):
+    """
+    Splits given iterable into lists of at most `size` items
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_serialize_parallel(objects, only=None, exclude=None, include=None,
+                            workers=None, chunk_size=500,
+                            executor='process', options=None):
+    """
+    Serializes given objects in parallel and yields the serialized
+    dictionaries in input order. At most two chunks per worker are in flight
+    at a time, so arbitrarily large iterables can be serialized with bounded
+    memory.
+
+    :param objects: iterable of serializable objects
+    :param only: same as in :func:`serializer.serialize`
+    :param exclude: same as in :func:`serializer.serialize`
+    :param include: same as in :func:`serializer.serialize`
+    :param workers: number of workers, defaults to the number of CPUs. With
+        one worker the objects are serialized in the calling thread. With
+        an executor instance this only limits the number of chunks in
+        flight.
+    :param chunk_size: number of objects serialized per task
+    :param executor: 'process', 'thread' or a concurrent.futures.Executor
+        instance to use. With an executor instance the options are sent
+        along with each chunk.
+    :param options: :class:`serializer.SerializeOptions` object to use
+        instead of only, exclude and include
+    """
+    if options is None:
+        options = SerializeOptions(only=only, exclude=exclude, include=include)
+    chunks = chunked(objects, chunk_size)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            for serialized in options.serialize_many(chunk):
+                yield serialized
+        return
+
+    if isinstance(executor, Executor):
+        pool = executor
+        owns_pool = False
+        task = partial(_serialize_chunk, options=options)
+    elif executor == 'process':
+        pool = ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(options, )
+        )
+        owns_pool = True
+        task = _serialize_chunk
+    elif executor == 'thread':
+        pool = ThreadPoolExecutor(workers)
+        owns_pool = True
+        task = partial(_serialize_chunk, options=options)
+    else:
+        raise ValueError('Unknown executor %r' % (executor, ))
+
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(pool.submit(task, chunk))
+            if len(pending) >= workers * 2:
+                for serialized in pending.popleft().result():
+                    yield serialized
+        while pending:
+            for serialized in pending.popleft().result():
+                yield serialized
+    finally:
+        for future in pending:
+            future.cancel()
+        if owns_pool:
+            pool.shutdown()
+
+
+def serialize_parallel(objects, only=None, exclude=None, include=None,
+                       workers=None, chunk_size=500, executor='process',
+                       options=None):
+    """
+    Serializes given objects in parallel and returns a list of serialized
+    dictionaries in input order. See :func:`iter_serialize_parallel` for
+    the parameters.
+
+    Examples::
+
+        >>> serialize_parallel(User.query.all(), only=['id', 'name'],
+        ...                    workers=4)
+        [{'id': 1, 'name': 'John'}, {'id': 2, 'name': 'Jack'}, ...]
+    """
+    return list(iter_serialize_parallel(
+        objects,
+        only=only,
+        exclude=exclude,
+        include=include,
+        workers=workers,
+        chunk_size=chunk_size,
+        executor=executor,
+        options=options
+    ))
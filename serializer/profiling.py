@@ -0,0 +1,273 @@
+"""
+Optional instrumentation of the serialization pipeline.
+
+Profiling works by temporarily replacing the plan executor, dump_object and
+the JSON backend lookup with timed versions, hence it has no overhead at all
+when not active. The results are scoped to the context (thread or asyncio
+task) the :func:`profile` block runs in, in the same way as
+:func:`serializer.memoize`: while the block is active, serializations in
+other threads only pay for a context variable lookup and are not recorded.
+Threads started within the block are not profiled, asyncio tasks are.
+
+Only the core pipeline of :func:`serializer.serialize`,
+``Serializable.as_json`` and ``Serializable.to_json`` is profiled. The
+streaming, asynchronous, iterative and binary format encoders walk the
+objects with their own code and are not recorded.
+
+Examples::
+
+    >>> with profile() as report:
+    ...     user.to_json(include=['posts'])
+    >>> print(report)
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import serializer
+from serializer import (
+    SerializationPlan,
+    call_attribute,
+    empty,
+    is_callable,
+    resolve_dumper,
+)
+
+
+timer = time.perf_counter
+
+
+class Stats(object):
+    """
+    Call count and cumulative time of a single dumper or of encoding
+    """
+    __slots__ = ('count', 'time')
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+
+    def __repr__(self):
+        return '<Stats count=%d time=%.6f>' % (self.count, self.time)
+
+
+class AttributeStats(object):
+    """
+    Call count and cumulative times of a single attribute, split into
+    attribute access (including properties), method calls and dumping of the
+    value. The dump time includes the serialization of nested objects.
+    """
+    __slots__ = ('count', 'access_time', 'call_time', 'dump_time')
+
+    def __init__(self):
+        self.count = 0
+        self.access_time = 0.0
+        self.call_time = 0.0
+        self.dump_time = 0.0
+
+    @property
+    def time(self):
+        return self.access_time + self.call_time + self.dump_time
+
+    def __repr__(self):
+        return (
+            '<AttributeStats count=%d access_time=%.6f call_time=%.6f '
+            'dump_time=%.6f>'
+        ) % (self.count, self.access_time, self.call_time, self.dump_time)
+
+
+class ProfileReport(object):
+    """
+    Profiling results.
+
+    :ivar attributes: dict of (class name, attribute name) ->
+        :class:`AttributeStats`
+    :ivar dumpers: dict of '<dumper name>(<value type name>)' ->
+        :class:`Stats`
+    :ivar encoding: :class:`Stats` of the JSON encoding done by the JSON
+        backends
+    """
+
+    def __init__(self):
+        self.attributes = {}
+        self.dumpers = {}
+        self.encoding = Stats()
+
+    def attribute(self, class_name, attr):
+        try:
+            return self.attributes[(class_name, attr)]
+        except KeyError:
+            stats = self.attributes[(class_name, attr)] = AttributeStats()
+            return stats
+
+    def dumper(self, name):
+        try:
+            return self.dumpers[name]
+        except KeyError:
+            stats = self.dumpers[name] = Stats()
+            return stats
+
+    def __str__(self):
+        lines = [
+            '%-40s %8s %10s %10s %10s' % (
+                'attribute', 'count', 'access', 'call', 'dump'
+            )
+        ]
+        for (class_name, attr), stats in sorted(
+            self.attributes.items(), key=lambda item: -item[1].time
+        ):
+            lines.append('%-40s %8d %10.6f %10.6f %10.6f' % (
+                '%s.%s' % (class_name, attr),
+                stats.count,
+                stats.access_time,
+                stats.call_time,
+                stats.dump_time
+            ))
+        lines.append('')
+        lines.append('%-40s %8s %10s' % ('dumper', 'count', 'time'))
+        for name, stats in sorted(
+            self.dumpers.items(), key=lambda item: -item[1].time
+        ):
+            lines.append(
+                '%-40s %8d %10.6f' % (name, stats.count, stats.time)
+            )
+        lines.append('')
+        lines.append('%-40s %8d %10.6f' % (
+            'encoding', self.encoding.count, self.encoding.time
+        ))
+        return '\n'.join(lines)
+
+
+class TimedBackend(object):
+    """
+    JSON backend proxy recording the encoding time
+    """
+
+    def __init__(self, backend, report):
+        self.backend = backend
+        self.report = report
+
+    def dumps(self, value, **options):
+        start = timer()
+        try:
+            return self.backend.dumps(value, **options)
+        finally:
+            self._record(start)
+
+    def dumpb(self, value, **options):
+        start = timer()
+        try:
+            return self.backend.dumpb(value, **options)
+        finally:
+            self._record(start)
+
+    def _record(self, start):
+        stats = self.report.encoding
+        stats.count += 1
+        stats.time += timer() - start
+
+
+_report = ContextVar('serializer_profile', default=None)
+_lock = threading.Lock()
+_active = []
+_originals = {}
+
+
+def profiled_dump_object(value, args):
+    report = _report.get()
+    if report is None:
+        return _originals['dump_object'](value, args)
+    dumper = resolve_dumper(value, args)
+    if dumper is None:
+        return value
+    stats = report.dumper('%s(%s)' % (
+        getattr(dumper, '__name__', repr(dumper)),
+        type(value).__name__
+    ))
+    start = timer()
+    try:
+        return dumper(value, args)
+    finally:
+        stats.count += 1
+        stats.time += timer() - start
+
+
+def profiled_plan_call(plan, serializable):
+    report = _report.get()
+    if report is None:
+        return _originals['plan_call'](plan, serializable)
+    class_name = type(serializable).__name__
+    serialized = {}
+    for attr, alias, args in plan.steps:
+        start = timer()
+        value = getattr(serializable, attr, empty)
+        accessed = timer()
+        if is_callable(value):
+            value = call_attribute(value)
+            called = timer()
+        else:
+            called = accessed
+        value = profiled_dump_object(value, args)
+        dumped = timer()
+
+        stats = report.attribute(class_name, attr)
+        stats.count += 1
+        stats.access_time += accessed - start
+        stats.call_time += called - accessed
+        stats.dump_time += dumped - called
+
+        if value is empty:
+            serialized.pop(alias, None)
+        else:
+            serialized[alias] = value
+    return serialized
+
+
+def profiled_get_json_backend(backend=None):
+    json_backend = _originals['get_json_backend'](backend)
+    report = _report.get()
+    if report is None:
+        return json_backend
+    return TimedBackend(json_backend, report)
+
+
+def _install():
+    _originals['dump_object'] = serializer.dump_object
+    _originals['get_json_backend'] = serializer.get_json_backend
+    _originals['plan_call'] = SerializationPlan.__call__
+    serializer.dump_object = profiled_dump_object
+    serializer.get_json_backend = profiled_get_json_backend
+    SerializationPlan.__call__ = profiled_plan_call
+
+
+def _uninstall():
+    SerializationPlan.__call__ = _originals.pop('plan_call')
+    serializer.get_json_backend = _originals.pop('get_json_backend')
+    serializer.dump_object = _originals.pop('dump_object')
+
+
+@contextmanager
+def profile():
+    """
+    Context manager which profiles the serializations done within the block
+    in the current context and yields a :class:`ProfileReport` collecting
+    the results. Blocks in different threads may be active at the same time,
+    each with its own report.
+    """
+    if _report.get() is not None:
+        raise RuntimeError('Profiling is already active')
+    report = ProfileReport()
+    with _lock:
+        if not _active:
+            _install()
+        _active.append(report)
+    token = _report.set(report)
+    try:
+        yield report
+    finally:
+        _report.reset(token)
+        with _lock:
+            _active.remove(report)
+            if not _active:
+                _uninstall()
@@ -0,0 +1,157 @@
+"""
+Declarative schema classes.
+
+Instead of overriding :meth:`serializer.Serializable.attributes`, the
+serialized attributes of a :class:`Schema` are declared as class level
+:class:`Field` objects. The fields are collected once when the class is
+created: their values are stored in ``__slots__`` and the field table is
+kept in the ``__fields__`` class attribute, hence no attribute lists are
+built per call. The dumper of each field is resolved once per serialization
+plan instead of once per value.
+
+Examples::
+
+    >>> class User(Schema):
+    ...     id = Field(int)
+    ...     name = Field(str, alias='full_name')
+    ...     created_at = Field(datetime)
+    ...     role = Field(str, default='member')
+    ...
+    >>> User(id=1, name='John').as_json()
+    {'id': 1, 'full_name': 'John', 'role': 'member'}
+
+Schemas are ordinary :class:`serializer.Serializable` objects, so the only,
+exclude and include arguments, attribute sets and method valued attributes
+work as usual.
+"""
+from collections import OrderedDict
+from itertools import count
+
+from serializer import (
+    OBJECT_DUMPERS,
+    Serializable,
+    dump_list,
+    dump_serializable,
+    empty,
+)
+
+
+_counter = count()
+
+
+class Field(object):
+    """
+    Declares a serialized attribute of a :class:`Schema`.
+
+    :param type: type of the field values. If no dumper is given, the dumper
+        registered in :data:`serializer.OBJECT_DUMPERS` for this type is
+        resolved when the serialization plan is compiled and used for all
+        values of the field regardless of their runtime type.
+    :param alias: key of the field in the serialized output, an alias given
+        with 'as' in the spec takes precedence
+    :param dumper: function dumping the field values, taking the value and
+        the attribute args like the functions in OBJECT_DUMPERS
+    :param default: value of the field when it is not given to the
+        constructor. Fields without value are left out of the serialized
+        output.
+    """
+    __slots__ = ('name', 'type', 'alias', 'dumper', 'default', 'order')
+
+    def __init__(self, type=None, alias=None, dumper=None, default=empty):
+        self.name = None
+        self.type = type
+        self.alias = alias
+        self.dumper = dumper
+        self.default = default
+        self.order = next(_counter)
+
+    def __repr__(self):
+        return 'Field(%r, type=%r, alias=%r)' % (
+            self.name, self.type, self.alias
+        )
+
+    def compile(self, args):
+        """
+        Stores the dumper of this field into given
+        :class:`serializer.PlanArgs`. Nested objects and lists are left to
+        the regular dispatch, since their args are shared with their items.
+        """
+        if self.dumper is not None:
+            args.dumper = self.dumper
+        elif self.type is not None:
+            dumper = OBJECT_DUMPERS.resolve(self.type)
+            if dumper is not dump_serializable and dumper is not dump_list:
+                args.dumper = dumper
+
+
+class SchemaMeta(type):
+    """
+    Collects the :class:`Field` declarations of a schema class, including
+    the inherited ones, into the ``__fields__`` table and replaces them with
+    slots.
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        fields = OrderedDict()
+        for base in reversed(bases):
+            fields.update(getattr(base, '__fields__', None) or {})
+        inherited = set(fields)
+        declared = sorted(
+            (
+                (key, value) for key, value in namespace.items()
+                if isinstance(value, Field)
+            ),
+            key=lambda item: item[1].order
+        )
+        for key, field in declared:
+            del namespace[key]
+            field.name = key
+            fields[key] = field
+
+        slots = namespace.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots, )
+        namespace['__slots__'] = tuple(
+            key for key, field in declared if key not in inherited
+        ) + tuple(slots)
+        namespace['__fields__'] = fields
+        namespace['_attributes'] = tuple(fields)
+        return type.__new__(mcs, name, bases, namespace)
+
+
+class Schema(Serializable, metaclass=SchemaMeta):
+    """
+    Base class for declarative schemas. Field values are given to the
+    constructor as keyword arguments.
+
+    Schema classes use slots, instances have no ``__dict__`` unless it is
+    listed in the ``__slots__`` of the class.
+    """
+
+    def __init__(self, **values):
+        for name, field in self.__fields__.items():
+            try:
+                value = values.pop(name)
+            except KeyError:
+                if field.default is empty:
+                    continue
+                value = field.default
+            setattr(self, name, value)
+        if values:
+            raise TypeError(
+                '%s got an unexpected keyword argument %r' % (
+                    type(self).__name__, sorted(values)[0]
+                )
+            )
+
+    def __repr__(self):
+        return '%s(%s)' % (
+            type(self).__name__,
+            ', '.join(
+                '%s=%r' % (name, getattr(self, name))
+                for name in self._attributes if hasattr(self, name)
+            )
+        )
+
+    def attributes(self):
+        return self._attributes
@@ -0,0 +1,167 @@
+"""
+Incremental JSON encoding of serializable object graphs.
+
+The functions in this module walk the object graph with the same
+serialization plans as :func:`serializer.serialize` but emit JSON text as
+they go, hence the intermediate dictionaries and the full JSON string are
+never materialised.
+"""
+from serializer import (
+    _identity,
+    call_attribute,
+    compile_args,
+    dump_list,
+    dump_serializable,
+    dumps,
+    empty,
+    is_callable,
+    nested_plan,
+    resolve_dumper,
+    run_plan,
+)
+from serializer.backends import get_json_backend
+
+
+def iterencode_json(value, only=None, exclude=None, include=None,
+                    chunk_size=8192, backend=None, **kwargs):
+    """
+    Returns a generator yielding the JSON representation of given value in
+    chunks of roughly `chunk_size` characters.
+
+    :param value: Serializable object or a list of serializable objects
+    :param only: same as in :func:`serializer.serialize`
+    :param exclude: same as in :func:`serializer.serialize`
+    :param include: same as in :func:`serializer.serialize`
+    :param chunk_size: minimum size of the yielded chunks, the last chunk
+        may be smaller
+    :param backend: name of the JSON backend whose output is reproduced,
+        see :mod:`serializer.backends`. The JSON is encoded with a
+        JSONEncoder configured to encode values, such as Decimals, and to
+        format the output the same way as the backend. Only the formatting
+        of floats may differ, for example orjson writes ``1e19`` where
+        Python writes ``1e+19``. Indented output is encoded from the
+        serialized dictionaries rather than incrementally.
+    :param kwargs: additional encoder options, as for the backend
+
+    Examples::
+
+        >>> def application(environ, start_response):
+        ...     headers = [('Content-Type', 'application/json')]
+        ...     start_response('200 OK', headers)
+        ...     return iterencode_json(User.query.all(), only=['name'])
+    """
+    encoder = get_json_backend(backend).encoder(**kwargs)
+    args = compile_args(
+        dict(only=only, exclude=exclude, include=include)
+    )
+    if encoder.indent is not None:
+        # Indentation depends on the nesting level, which the incremental
+        # encoder does not track, hence the serialized value is encoded
+        # as a whole
+        chunks = encoder.iterencode(dumps(value, args))
+    else:
+        chunks = encode_value(value, args, encoder)
+    return buffer_chunks(chunks, chunk_size)
+
+
+def dump_json(value, fp, only=None, exclude=None, include=None,
+              chunk_size=8192, **kwargs):
+    """
+    Writes the JSON representation of given value into file-like object
+    `fp`. See :func:`iterencode_json` for the parameters.
+    """
+    write = fp.write
+    for chunk in iterencode_json(
+        value,
+        only=only,
+        exclude=exclude,
+        include=include,
+        chunk_size=chunk_size,
+        **kwargs
+    ):
+        write(chunk)
+
+
+def buffer_chunks(chunks, chunk_size):
+    """
+    Joins given iterable of small string chunks into chunks of at least
+    `chunk_size` characters
+    """
+    buffer = []
+    length = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def encode_value(value, args, encoder):
+    """
+    Yields the JSON chunks of given value. Nested serializable objects and
+    lists using the default dumpers are encoded incrementally, other values
+    are dumped with their dumper and encoded as a whole.
+    """
+    if is_callable(value):
+        value = call_attribute(value)
+    dumper = resolve_dumper(value, args)
+    if dumper is dump_serializable:
+        for chunk in encode_object(value, args, encoder):
+            yield chunk
+    elif dumper is dump_list:
+        for chunk in encode_list(value, args, encoder):
+            yield chunk
+    else:
+        if dumper is not None:
+            value = dumper(value, args)
+        for chunk in encoder.iterencode(value):
+            yield chunk
+
+
+def encode_object(serializable, args, encoder):
+    plan = nested_plan(serializable, args)
+    if _identity.get() is not None:
+        # Identity tracking needs the serialized dictionaries for reuse
+        for chunk in encoder.iterencode(run_plan(plan, serializable)):
+            yield chunk
+        return
+    steps = plan.unique_steps
+    if encoder.sort_keys:
+        steps = sorted(steps, key=lambda step: step[1])
+    separator = '{'
+    for attr, alias, step_args in steps:
+        value = getattr(serializable, attr, empty)
+        if is_callable(value):
+            value = call_attribute(value)
+        dumper = resolve_dumper(value, step_args)
+        if dumper is dump_serializable:
+            chunks = encode_object(value, step_args, encoder)
+        elif dumper is dump_list:
+            chunks = encode_list(value, step_args, encoder)
+        else:
+            if dumper is not None:
+                value = dumper(value, step_args)
+            if value is empty:
+                continue
+            chunks = encoder.iterencode(value)
+        yield separator
+        yield encoder.encode(alias)
+        yield encoder.key_separator
+        for chunk in chunks:
+            yield chunk
+        separator = encoder.item_separator
+    yield '{}' if separator == '{' else '}'
+
+
+def encode_list(values, args, encoder):
+    separator = '['
+    for value in values:
+        yield separator
+        for chunk in encode_value(value, args, encoder):
+            yield chunk
+        separator = encoder.item_separator
+    yield '[]' if separator == '[' else ']'
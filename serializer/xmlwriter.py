@@ -0,0 +1,151 @@
+"""
+XML writer for serialized dictionaries.
+
+The writer emits XML text directly from the dictionaries returned by
+:func:`serializer.serialize` without building a DOM. Dictionaries become
+elements, lists become repeated elements with the tag name of the list and
+all other values become text content.
+"""
+
+
+def escape(data):
+    """
+    Escapes given text content the same way xml.dom.minidom does
+    """
+    return (
+        data.replace('&', '&amp;')
+        .replace('<', '&lt;')
+        .replace('"', '&quot;')
+        .replace('>', '&gt;')
+    )
+
+
+def text(value):
+    if isinstance(value, str):
+        return value
+    return str(value)
+
+
+def iterencode_xml(structure, root=None, pretty=False, indent='\t',
+                   newl='\n', encoding=None, chunk_size=8192):
+    """
+    Returns a generator yielding the XML representation of given serialized
+    structure in chunks of roughly `chunk_size` characters.
+
+    If `root` is not given and the structure contains exactly one key, that
+    key is used as the root element. If `root` is not given and the
+    structure contains multiple keys only the XML declaration is written.
+
+    :param structure: serialized dictionary
+    :param root: name of the root element wrapping the structure
+    :param pretty: whether or not to write one indented element per line
+    :param indent: indentation string used in pretty mode
+    :param newl: newline string used after the declaration and the document
+        element, and between elements in pretty mode
+    :param encoding: if given, the encoding is included in the declaration
+        and the yielded chunks are encoded bytes
+    :param chunk_size: minimum size of the yielded chunks
+    """
+    chunks = _iter_document(
+        structure, root, pretty, indent, newl, encoding, chunk_size
+    )
+    if encoding is None:
+        return chunks
+    return (chunk.encode(encoding) for chunk in chunks)
+
+
+def dumps_xml(structure, root=None, pretty=False, indent='\t', newl='\n',
+              encoding=None):
+    """
+    Returns the XML representation of given serialized structure. See
+    :func:`iterencode_xml` for the parameters.
+    """
+    chunks = iterencode_xml(
+        structure,
+        root=root,
+        pretty=pretty,
+        indent=indent,
+        newl=newl,
+        encoding=encoding,
+        chunk_size=float('inf')
+    )
+    if encoding is None:
+        return ''.join(chunks)
+    return b''.join(chunks)
+
+
+def dump_xml(structure, fp, root=None, pretty=False, indent='\t', newl='\n',
+             encoding=None, chunk_size=8192):
+    """
+    Writes the XML representation of given serialized structure into
+    file-like object `fp`. See :func:`iterencode_xml` for the parameters.
+    """
+    write = fp.write
+    for chunk in iterencode_xml(
+        structure,
+        root=root,
+        pretty=pretty,
+        indent=indent,
+        newl=newl,
+        encoding=encoding,
+        chunk_size=chunk_size
+    ):
+        write(chunk)
+
+
+def _iter_document(structure, root, pretty, indent, newl, encoding,
+                   chunk_size):
+    if encoding is None:
+        buffer = ['<?xml version="1.0" ?>', newl]
+    else:
+        buffer = ['<?xml version="1.0" encoding="%s"?>' % encoding, newl]
+    if root is None:
+        if len(structure) != 1:
+            yield ''.join(buffer)
+            return
+        root, structure = next(iter(structure.items()))
+    if pretty:
+        element_newl = newl
+    else:
+        indent = element_newl = ''
+
+    if isinstance(structure, dict) and structure:
+        # The children of the root element are written one by one so that
+        # the buffer can be flushed between them.
+        append = buffer.append
+        append('<%s>%s' % (root, element_newl))
+        length = 0
+        for key, value in structure.items():
+            size = len(buffer)
+            _build(buffer, key, value, 1, indent, element_newl)
+            length += sum(len(chunk) for chunk in buffer[size:])
+            if length >= chunk_size:
+                yield ''.join(buffer)
+                del buffer[:]
+                length = 0
+        append('</%s>%s' % (root, element_newl))
+    else:
+        _build(buffer, root, structure, 0, indent, element_newl)
+    if not pretty:
+        buffer.append(newl)
+    yield ''.join(buffer)
+
+
+def _build(buffer, tag, value, level, indent, newl):
+    append = buffer.append
+    if isinstance(value, list):
+        for item in value:
+            _build(buffer, tag, item, level, indent, newl)
+    elif isinstance(value, dict):
+        prefix = indent * level
+        if not value:
+            append('%s<%s/>%s' % (prefix, tag, newl))
+            return
+        append('%s<%s>%s' % (prefix, tag, newl))
+        for key in value:
+            _build(buffer, key, value[key], level + 1, indent, newl)
+        append('%s</%s>%s' % (prefix, tag, newl))
+    else:
+        append('%s<%s>%s</%s>%s' % (
+            indent * level, tag, escape(text(value)), tag, newl
+        ))
@@ -20,16 +20,44 @@ setup(
     license='BSD',
     zip_safe=False,
     platforms='any',
+    python_requires='>=3.7',
     install_requires=[
         'setuptools',
         'simplejson'
     ],
+    extras_require={
+        'cbor': ['cbor2'],
+        'msgpack': ['msgpack'],
+        'numpy': ['numpy'],
+        'orjson': ['orjson'],
+        'pandas': ['numpy', 'pandas'],
+        'sqlalchemy': ['SQLAlchemy>=1.4'],
+        'test': [
+            'cbor2',
+            'msgpack',
+            'numpy',
+            'orjson',
+            'pandas',
+            'pytest',
+            'SQLAlchemy>=1.4',
+            'ujson',
+        ],
+        'ujson': ['ujson'],
+    },
     classifiers=[
         'Development Status :: 4 - Beta',
         'Intended Audience :: Developers',
         'License :: OSI Approved :: BSD License',
         'Operating System :: OS Independent',
         'Programming Language :: Python',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
         'Topic :: Software Development :: Libraries :: Python Modules'
     ]
 )
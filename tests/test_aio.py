@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime
+
+from serializer import (
+    Serializable,
+    memoize,
+    serialize_async,
+    serialize_many_async,
+)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class Post(Serializable):
+    def __init__(self, title, delay=0.05):
+        self.title = title
+        self.delay = delay
+
+    def attributes(self):
+        return ['title', 'created_at']
+
+    async def created_at(self):
+        await asyncio.sleep(self.delay)
+        return datetime(2011, 1, 1)
+
+
+class User(Serializable):
+    def __init__(self, name, posts=()):
+        self.name = name
+        self._posts = list(posts)
+
+    def attributes(self):
+        return ['name', 'posts', 'missing']
+
+    async def posts(self):
+        await asyncio.sleep(0.05)
+        return self._posts
+
+
+class Counter(Serializable):
+    def __init__(self):
+        self.calls = 0
+
+    def attributes(self):
+        return ['count']
+
+    def count(self):
+        self.calls += 1
+        return self.calls
+
+
+class TestSerializeAsync(object):
+    def test_awaits_awaitable_attributes(self):
+        user = User('John', [Post('First'), Post('Second')])
+        assert run(user.as_json_async()) == {
+            'name': 'John',
+            'posts': [
+                {'title': 'First', 'created_at': '2011-01-01T00:00:00Z'},
+                {'title': 'Second', 'created_at': '2011-01-01T00:00:00Z'},
+            ]
+        }
+
+    def test_supports_specs(self):
+        user = User('John', [Post('First')])
+        assert run(serialize_async(
+            user, only=['name', ('posts', {'only': ['title']})]
+        )) == {'name': 'John', 'posts': [{'title': 'First'}]}
+
+    def test_awaits_concurrently(self):
+        users = [
+            User('User %d' % index, [Post(str(i), 0.1) for i in range(5)])
+            for index in range(5)
+        ]
+        loop = asyncio.new_event_loop()
+        try:
+            start = loop.time()
+            serialized = loop.run_until_complete(serialize_many_async(users))
+            elapsed = loop.time() - start
+        finally:
+            loop.close()
+        assert len(serialized) == 5
+        assert len(serialized[4]['posts']) == 5
+        assert elapsed < 0.5
+
+    def test_matches_sync_serialization_without_awaitables(self):
+        post = Post('First')
+        post.created_at = datetime(2011, 1, 1)
+        assert run(post.as_json_async()) == post.as_json()
+
+    def test_memoized_awaitables_can_be_reached_twice(self):
+        user = User('John', [Post('First')])
+
+        async def serialize_twice():
+            with memoize():
+                return await serialize_many_async([user, user])
+
+        first, second = run(serialize_twice())
+        assert first == second
+        assert first['posts'] == [
+            {'title': 'First', 'created_at': '2011-01-01T00:00:00Z'}
+        ]
+
+    def test_concurrent_memos_are_separate(self):
+        async def request(counter, delay):
+            with memoize():
+                await serialize_async(counter)
+                await asyncio.sleep(delay)
+                return await serialize_async(counter)
+
+        async def requests():
+            return await asyncio.gather(
+                request(Counter(), 0.01),
+                request(Counter(), 0.05)
+            )
+
+        assert run(requests()) == [{'count': 1}, {'count': 1}]
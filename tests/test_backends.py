@@ -0,0 +1,124 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from serializer import Serializable, SerializeOptions, empty
+from serializer.backends import (
+    available_backends,
+    get_json_backend,
+    replace_decimals,
+    set_json_backend,
+    StdlibBackend,
+)
+
+
+class User(Serializable):
+    def attributes(self):
+        return ['name', 'balance', 'created_at', 'extra']
+
+
+@pytest.fixture(params=available_backends())
+def backend(request):
+    return request.param
+
+
+BALANCE = Decimal('12345678901234567890.123456789')
+
+
+def loads(encoded):
+    return json.loads(encoded, parse_float=Decimal)
+
+
+@pytest.fixture
+def user():
+    user = User()
+    user.name = 'John'
+    user.balance = BALANCE
+    user.created_at = datetime(2011, 1, 1)
+    user.extra = {'born': date(2000, 1, 1), 'missing': empty}
+    return user
+
+
+class TestJSONBackends(object):
+    def test_to_json(self, backend, user):
+        serialized = loads(user.to_json(backend=backend))
+        assert Decimal(serialized.pop('balance')) == BALANCE
+        assert serialized == {
+            'name': 'John',
+            'created_at': '2011-01-01T00:00:00Z',
+            'extra': {'born': '2000-01-01', 'missing': None}
+        }
+
+    def test_decimals_are_encoded_exactly(self, backend):
+        encoded = get_json_backend(backend).dumps({'balance': BALANCE})
+        if backend == 'simplejson':
+            assert loads(encoded) == {'balance': BALANCE}
+        else:
+            assert loads(encoded) == {'balance': str(BALANCE)}
+
+    def test_decimals_as_floats(self, backend):
+        encoded = get_json_backend(backend).dumps(
+            {'balance': Decimal('10.5')}, use_decimal=False
+        )
+        assert json.loads(encoded) == {'balance': 10.5}
+
+    def test_to_json_as_bytes(self, backend, user):
+        encoded = user.to_json(only=['name'], backend=backend, as_bytes=True)
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded.decode('utf-8')) == {'name': 'John'}
+
+    def test_options_with_backend(self, backend, user):
+        options = SerializeOptions(
+            only=['name', 'balance'], backend=backend, sort_keys=True
+        )
+        encoded = options.dumpb(user).decode('utf-8')
+        assert encoded.index('balance') < encoded.index('name')
+        serialized = loads(user.to_json(options=options))
+        assert Decimal(serialized['balance']) == BALANCE
+
+    def test_unserializable_values_raise_type_error(self, backend):
+        with pytest.raises(TypeError):
+            get_json_backend(backend).dumps({'a': object()})
+
+    def test_nested_decimals_are_encoded_exactly(self, backend):
+        encoded = get_json_backend(backend).dumps(
+            {'rows': [(1, BALANCE)], 'missing': empty}
+        )
+        row = loads(encoded)['rows'][0]
+        assert Decimal(row[1]) == BALANCE
+
+
+class TestReplaceDecimals(object):
+    def test_replaces_nested_decimals(self):
+        value = {'a': [Decimal('1.5'), (Decimal('2'), 'x')], 'b': 1}
+        assert replace_decimals(value, str) == {
+            'a': ['1.5', ['2', 'x']], 'b': 1
+        }
+        assert value['a'][0] == Decimal('1.5')
+
+    def test_does_not_copy_containers_without_decimals(self):
+        value = {'a': [1, 2], 'b': {'c': 'd'}}
+        assert replace_decimals(value, str) is value
+
+
+class TestJSONBackendSelection(object):
+    def teardown_method(self, method):
+        set_json_backend(None)
+
+    def test_set_json_backend(self, user):
+        set_json_backend('json')
+        assert isinstance(get_json_backend(), StdlibBackend)
+        assert user.to_json(only=['balance']) == (
+            '{"balance": "12345678901234567890.123456789"}'
+        )
+
+    def test_accepts_backend_instances(self):
+        backend = StdlibBackend()
+        set_json_backend(backend)
+        assert get_json_backend() is backend
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            get_json_backend('unknown')
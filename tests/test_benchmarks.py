@@ -0,0 +1,41 @@
+from io import StringIO
+
+from benchmarks.legacy import legacy_serialize
+from benchmarks.models import build_graph, count_objects, include_spec
+from benchmarks.run import compare, run
+from serializer import serialize
+
+
+class TestBenchmarks(object):
+    def test_graph_size(self):
+        obj = build_graph(width=3, depth=3, list_size=2)
+        serialized = serialize(obj, include=include_spec(3))
+        assert len(serialized['children']) == 2
+        assert len(serialized['children'][0]['children']) == 2
+        assert count_objects(3, 2) == 7
+
+    def test_legacy_pipeline_output_is_identical(self):
+        obj = build_graph(width=10, depth=3, list_size=2)
+        spec = include_spec(3)
+        assert legacy_serialize(obj, include=spec) == serialize(
+            obj, include=spec
+        )
+
+    def test_run_reports_results(self):
+        out = StringIO()
+        results = run('serialize[width=5]', quick=True, out=out)
+        assert list(results) == ['serialize[width=5]']
+        assert results['serialize[width=5]']['objects_per_sec'] > 0
+        assert 'serialize[width=5]' in out.getvalue()
+
+    def test_compare_detects_regressions(self):
+        baseline = {
+            'a': {'objects_per_sec': 100.0},
+            'b': {'objects_per_sec': 100.0},
+        }
+        results = {
+            'a': {'objects_per_sec': 70.0},
+            'b': {'objects_per_sec': 95.0},
+            'c': {'objects_per_sec': 1.0},
+        }
+        assert compare(results, baseline, 0.2, out=StringIO()) == ['a']
@@ -0,0 +1,145 @@
+import json
+import threading
+from io import BytesIO
+
+import pytest
+
+from serializer import Serializable, SerializeOptions
+from serializer.buffers import BufferPool, encode_into, encoded
+
+
+class User(Serializable):
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+    def attributes(self):
+        return ['id', 'name']
+
+
+class TestEncodeInto(object):
+    def test_bytearray(self):
+        buffer = bytearray()
+        with encode_into(User(1, u'Jäkki'), buffer) as view:
+            assert json.loads(view.tobytes().decode('utf-8')) == {
+                'id': 1, 'name': u'Jäkki'
+            }
+            assert len(view) == len(buffer)
+
+    def test_reused_bytearray_keeps_its_size(self):
+        buffer = bytearray(b'x' * 100)
+        with encode_into(User(1, 'John'), buffer, only=['id']) as view:
+            assert view.tobytes() == b'{"id": 1}'
+        assert len(buffer) == 100
+        assert buffer[9:] == b'x' * 91
+
+    def test_grows_bytearray(self):
+        buffer = bytearray(b'xx')
+        with encode_into([User(1, 'a' * 100)], buffer, offset=1) as view:
+            assert len(view) == len(buffer) - 1
+            assert json.loads(view.tobytes()) == [{'id': 1, 'name': 'a' * 100}]
+
+    def test_offset_past_end(self):
+        with pytest.raises(ValueError):
+            encode_into(User(1, 'John'), bytearray(), offset=1)
+
+    def test_small_chunks(self):
+        users = [User(index, 'User %d' % index) for index in range(50)]
+        buffer = bytearray()
+        with encode_into(users, buffer, chunk_size=16) as view:
+            assert len(json.loads(view.tobytes())) == 50
+
+    def test_chunked_bytes_io(self):
+        fp = BytesIO()
+        with encode_into(
+            User(1, u'Jäkki'), fp, chunk_size=4, sort_keys=True
+        ) as view:
+            assert view.tobytes() == (
+                u'{"id": 1, "name": "J\\u00e4kki"}'.encode('utf-8')
+            )
+
+    def test_bytes_io(self):
+        fp = BytesIO(b'prefix')
+        with encode_into(
+            User(1, 'John'), fp, offset=6, sort_keys=True
+        ) as view:
+            assert view.tobytes() == b'{"id": 1, "name": "John"}'
+        assert fp.getvalue().startswith(b'prefix{')
+
+    def test_backend(self):
+        buffer = bytearray()
+        with encode_into(
+            User(1, 'John'), buffer, only=['id'], backend='json'
+        ) as view:
+            assert json.loads(view.tobytes()) == {'id': 1}
+
+    def test_chunked_encoding_with_backend(self):
+        user = User(1, 'John')
+        expected = user.to_json(backend='json', as_bytes=True)
+        with encode_into(
+            user, bytearray(), backend='json', chunk_size=4
+        ) as view:
+            assert view.tobytes() == expected
+
+    def test_options(self):
+        options = SerializeOptions(only=['name'], separators=(',', ':'))
+        buffer = bytearray()
+        with encode_into(User(1, 'John'), buffer, options=options) as view:
+            assert view.tobytes() == b'{"name":"John"}'
+
+
+class TestBufferPool(object):
+    def test_reuses_released_buffers(self):
+        pool = BufferPool()
+        with pool.buffer() as buffer:
+            buffer += b'data'
+        with pool.buffer() as reused:
+            assert reused is buffer
+
+    def test_discards_large_buffers(self):
+        pool = BufferPool(max_size=10)
+        with pool.buffer() as buffer:
+            buffer += b'x' * 11
+        assert pool.idle == []
+
+    def test_max_buffers(self):
+        pool = BufferPool(max_buffers=1)
+        first = pool.acquire()
+        second = pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        assert pool.idle == [first]
+        pool.clear()
+        assert pool.idle == []
+
+    def test_buffers_are_per_thread(self):
+        pool = BufferPool()
+        pool.release(pool.acquire())
+        idle = []
+        thread = threading.Thread(target=lambda: idle.append(pool.idle))
+        thread.start()
+        thread.join()
+        assert idle == [[]]
+        assert len(pool.idle) == 1
+
+
+class TestEncoded(object):
+    def test_releases_view_and_buffer(self):
+        pool = BufferPool()
+        with encoded(User(1, 'John'), only=['id'], pool=pool) as view:
+            assert view.tobytes() == b'{"id": 1}'
+        with pytest.raises(ValueError):
+            view.tobytes()
+        buffer, = pool.idle
+        # The buffer can be resized again once the view is released
+        buffer += b'more'
+
+    def test_reuses_pooled_buffer(self):
+        pool = BufferPool()
+        with encoded(User(1, 'a' * 50), pool=pool) as view:
+            first = len(view)
+        buffer, = pool.idle
+        with encoded(User(2, 'b'), pool=pool, sort_keys=True) as view:
+            assert view.tobytes() == b'{"id": 2, "name": "b"}'
+        assert pool.idle == [buffer]
+        assert len(buffer) == first
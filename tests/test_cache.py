@@ -0,0 +1,190 @@
+import functools
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+from multiprocessing import Manager
+
+import pytest
+
+from serializer import Serializable, SerializeOptions
+from serializer.cache import (
+    ClientBackend,
+    LocalClient,
+    MappingBackend,
+    MemoryBackend,
+    SerializationCache,
+    stable_repr,
+)
+
+
+OPTIONS_KEY_SCRIPT = """
+import json
+from serializer import SerializeOptions
+from serializer.cache import SerializationCache
+options = SerializeOptions(
+    only=['id', 'name'], default=json.dumps, cls=json.JSONEncoder
+)
+print(SerializationCache().options_key(options))
+"""
+
+
+class User(Serializable):
+    serializations = 0
+
+    def __init__(self, id, name, updated_at=datetime(2011, 1, 1)):
+        self.id = id
+        self.name = name
+        self.updated_at = updated_at
+
+    def attributes(self):
+        return ['id', 'name', 'counted']
+
+    def counted(self):
+        User.serializations += 1
+        return True
+
+
+@pytest.fixture(params=['memory', 'client'])
+def cache(request):
+    if request.param == 'memory':
+        backend = MemoryBackend()
+    else:
+        backend = ClientBackend(LocalClient(), timeout=60)
+    return SerializationCache(backend)
+
+
+class TestSerializationCache(object):
+    def setup_method(self, method):
+        User.serializations = 0
+
+    def test_caches_encoded_json(self, cache):
+        user = User(1, 'John')
+        first = cache.dumpb(user, only=['id', 'name'])
+        second = cache.dumpb(user, only=['id', 'name'])
+        assert json.loads(first.decode('utf-8')) == {'id': 1, 'name': 'John'}
+        assert first == second
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_version_change_invalidates(self, cache):
+        user = User(1, 'John')
+        cache.to_json(user)
+        user.name = 'Jack'
+        user.updated_at = datetime(2012, 1, 1)
+        assert json.loads(cache.to_json(user))['name'] == 'Jack'
+        assert User.serializations == 2
+
+    def test_options_are_part_of_the_key(self, cache):
+        user = User(1, 'John')
+        assert cache.as_json(user, only=['id']) == {'id': 1}
+        assert cache.as_json(user, options=SerializeOptions(
+            only=['name']
+        )) == {'name': 'John'}
+
+    def test_objects_without_version_are_not_cached(self, cache):
+        user = User(1, 'John', updated_at=None)
+        cache.as_json(user)
+        cache.as_json(user)
+        assert User.serializations == 2
+        assert cache.hits == 0
+
+    def test_invalidate(self, cache):
+        user = User(1, 'John')
+        cache.as_json(user)
+        cache.dumpb(user)
+        cache.invalidate(user)
+        cache.as_json(user)
+        cache.dumpb(user)
+        assert User.serializations == 4
+
+    def test_clear(self, cache):
+        user = User(1, 'John')
+        cache.as_json(user)
+        cache.clear()
+        cache.as_json(user)
+        assert User.serializations == 2
+
+    def test_options_key_is_computed_once(self, cache):
+        options = SerializeOptions(only=['id'], sort_keys=True)
+        key = cache.options_key(options)
+        assert cache.options_key(options) is key
+        assert cache.options_key(
+            SerializeOptions(only=['id'], sort_keys=True)
+        ) is key
+
+    def test_options_key_is_stable_across_processes(self):
+        keys = set()
+        for seed in ('1', '2', '3'):
+            env = dict(os.environ, PYTHONHASHSEED=seed)
+            keys.add(subprocess.check_output(
+                [sys.executable, '-c', OPTIONS_KEY_SCRIPT], env=env
+            ))
+        assert len(keys) == 1
+
+    def test_stable_repr(self):
+        assert stable_repr({'default': json.dumps, 'indent': 2}) == (
+            "{'default': json.dumps, 'indent': 2}"
+        )
+        assert stable_repr(frozenset(['b', 'a'])) == "{'a', 'b'}"
+        assert stable_repr(functools.partial(json.dumps, indent=2)) == (
+            'functools.partial(json.dumps, indent=2)'
+        )
+
+    def test_lambdas_do_not_share_keys(self):
+        cache = SerializationCache()
+        user = User(1, 'John')
+        first = SerializeOptions(only=['name'], default=lambda value: 1)
+        second = SerializeOptions(only=['name'], default=lambda value: 2)
+        assert cache.options_key(first) != cache.options_key(second)
+        cache.dumpb(user, options=first)
+        cache.dumpb(user, options=second)
+        assert cache.misses == 2
+
+    def test_identical_partials_share_keys(self):
+        cache = SerializationCache()
+        first = SerializeOptions(default=functools.partial(str, 'a'))
+        second = SerializeOptions(default=functools.partial(str, 'a'))
+        assert cache.options_key(first) == cache.options_key(second)
+
+    def test_bound_methods_of_different_objects_do_not_share_keys(self):
+        cache = SerializationCache()
+        first = SerializeOptions(default=json.JSONEncoder().default)
+        second = SerializeOptions(default=json.JSONEncoder().default)
+        assert cache.options_key(first) != cache.options_key(second)
+
+
+class TestClientBackend(object):
+    def test_client_keys_are_memcached_safe(self):
+        client = LocalClient()
+        cache = SerializationCache(ClientBackend(client))
+        user = User(
+            1, 'John', updated_at=datetime(2020, 1, 1, 12, 0, 0, 123)
+        )
+        cache.dumpb(user, only=['id', 'name'])
+        assert cache.dumpb(user, only=['id', 'name']) is not None
+        assert cache.hits == 1
+        key, = client.data
+        assert key.startswith('serializer:')
+        assert len(key) <= 250
+        assert not any(char.isspace() for char in key)
+
+
+class TestMappingBackend(object):
+    def test_shared_manager_dict(self):
+        with Manager() as manager:
+            cache = SerializationCache(MappingBackend(manager.dict()))
+            user = User(1, 'John')
+            cache.dumpb(user)
+            cache.dumpb(user)
+            assert cache.hits == 1
+
+
+class TestLocalClient(object):
+    def test_expiration(self):
+        client = LocalClient()
+        client.set('a', b'1', timeout=-1)
+        client.set('b', b'2')
+        assert client.get('a') is None
+        assert client.get('b') == b'2'
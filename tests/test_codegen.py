@@ -0,0 +1,149 @@
+from datetime import date, datetime
+from io import StringIO
+
+import pytest
+
+from serializer import (
+    OBJECT_DUMPERS,
+    Field,
+    Schema,
+    Serializable,
+    compile_plan,
+    disable_codegen,
+    empty,
+    enable_codegen,
+    register_dumper,
+    serialize,
+    serialize_many,
+)
+
+
+class Money(object):
+    def __init__(self, amount):
+        self.amount = amount
+
+
+class Comment(Serializable):
+    def __init__(self, body):
+        self.body = body
+
+    def attributes(self):
+        return ['body']
+
+
+class Post(Serializable):
+    def __init__(self):
+        self.id = 1
+        self.title = 'Hello'
+        self.created_at = datetime(2011, 1, 1, 12, 30)
+        self.published = date(2011, 1, 2)
+        self.price = Money(10)
+        self.comments = [Comment('First'), Comment('Second')]
+        setattr(self, 'class', 'post')
+
+    def attributes(self):
+        return [
+            'id', 'title', 'created_at', 'published', 'missing', 'hidden',
+            'class', 'title as id'
+        ]
+
+    def attribute_sets(self):
+        return {'short': ['id', 'title']}
+
+    def hidden(self):
+        return empty
+
+    def word_count(self):
+        return 2
+
+
+class Tag(Schema):
+    name = Field(str)
+    created = Field(datetime)
+    price = Field(Money, dumper=lambda value, args: value.amount)
+
+
+@pytest.fixture
+def codegen():
+    enable_codegen()
+    yield
+    disable_codegen()
+
+
+SPECS = [
+    {},
+    {'only': 'short'},
+    {'exclude': ['title']},
+    {'include': ['word_count', 'price', ('comments', {'only': ['body']})]},
+]
+
+
+class TestCodegen(object):
+    def setup_method(self, method):
+        register_dumper(Money, lambda value, args: value.amount)
+
+    def teardown_method(self, method):
+        del OBJECT_DUMPERS[Money]
+
+    @pytest.mark.parametrize('spec', SPECS)
+    def test_output_equals_generic_executor(self, spec):
+        expected = serialize(Post(), **spec)
+        enable_codegen()
+        try:
+            assert serialize(Post(), **spec) == expected
+            assert compile_plan(Post(), **spec).function is not None
+        finally:
+            disable_codegen()
+        assert compile_plan(Post(), **spec).function is None
+
+    def test_key_order_equals_generic_executor(self):
+        expected = list(serialize(Post()))
+        enable_codegen()
+        try:
+            assert list(serialize(Post())) == expected
+        finally:
+            disable_codegen()
+
+    def test_schema_fields(self, codegen):
+        tag = Tag(name='new', created=datetime(2011, 1, 1), price=Money(5))
+        assert serialize_many([tag, Tag(created=None)]) == [
+            {'name': 'new', 'created': '2011-01-01T00:00:00Z', 'price': 5},
+            {'created': None}
+        ]
+
+    def test_known_dumpers_are_inlined(self, codegen):
+        source = compile_plan(Tag(), only=['created']).function.source
+        assert 'strftime' in source
+        assert 'dumper_0' not in source
+
+    def test_keyword_attribute_names(self, codegen):
+        source = compile_plan(Post(), only=['class']).function.source
+        assert "getattr(obj, 'class', empty)" in source
+        assert serialize(Post(), only=['class']) == {'class': 'post'}
+
+    def test_registering_dumper_regenerates_plans(self, codegen):
+        assert serialize(Post(), only=['price']) == {'price': 10}
+        register_dumper(Money, lambda value, args: '$%d' % value.amount)
+        assert serialize(Post(), only=['price']) == {'price': '$10'}
+
+    def test_debug_writes_source(self):
+        out = StringIO()
+        enable_codegen(debug=out)
+        try:
+            serialize(Post(), only=['id'])
+        finally:
+            disable_codegen()
+        assert 'def serialize_Post(obj' in out.getvalue()
+
+    @pytest.mark.parametrize('only', [
+        ['id', 'x\n    print("INJECTED")'],
+        ['id', 'title as x\r    print("INJECTED")'],
+    ])
+    def test_rejects_line_breaks_in_names(self, codegen, capsys, only):
+        with pytest.raises(ValueError):
+            serialize(Post(), only=only)
+        assert 'INJECTED' not in capsys.readouterr().out
+
+    def test_names_are_quoted_in_comments(self, codegen):
+        source = compile_plan(Post(), only=['id']).function.source
+        assert "# 'id'" in source
@@ -0,0 +1,115 @@
+from datetime import date
+
+from serializer import Serializable, empty
+from serializer.columnar import inflate, serialize_columns, serialize_rows
+
+
+class Team(Serializable):
+    def attributes(self):
+        return ['name']
+
+
+class User(Serializable):
+    def __init__(self, id, name, born=None):
+        self.id = id
+        self.name = name
+        self.born = born
+        self.team = Team()
+        self.team.name = 'Team A'
+
+    def attributes(self):
+        return ['id', 'name', 'born']
+
+
+class Admin(User):
+    def attributes(self):
+        return ['id', 'name', 'level']
+
+
+def create_users():
+    return [User(1, 'John', date(2000, 1, 1)), User(2, 'Jack')]
+
+
+class TestSerializeRows(object):
+    def test_row_major_table(self):
+        assert serialize_rows(create_users()) == {
+            'columns': ['id', 'name', 'born'],
+            'rows': [[1, 'John', '2000-01-01'], [2, 'Jack', None]]
+        }
+
+    def test_supports_specs(self):
+        table = serialize_rows(
+            create_users(),
+            only=['name as username'],
+            include=[('team', {'only': ['name']})]
+        )
+        assert table == {
+            'columns': ['username', 'team'],
+            'rows': [
+                ['John', {'name': 'Team A'}],
+                ['Jack', {'name': 'Team A'}]
+            ]
+        }
+
+    def test_empty_values_are_written_as_missing(self):
+        users = create_users()
+        users[1].name = empty
+        table = serialize_rows(users, only=['name'], missing='-')
+        assert table['rows'] == [['John'], ['-']]
+
+    def test_heterogeneous_objects(self):
+        admin = Admin(3, 'Jill')
+        admin.level = 10
+        table = serialize_rows(create_users() + [admin])
+        assert table['columns'] == ['id', 'name', 'born', 'level']
+        assert table['rows'][0] == [1, 'John', '2000-01-01', None]
+        assert table['rows'][2] == [3, 'Jill', None, 10]
+
+    def test_no_objects(self):
+        assert serialize_rows([]) == {'columns': [], 'rows': []}
+
+
+class TestSerializeColumns(object):
+    def test_column_major_arrays(self):
+        assert serialize_columns(create_users(), only=['id', 'name']) == {
+            'id': [1, 2],
+            'name': ['John', 'Jack']
+        }
+
+
+class TestInflate(object):
+    def test_inflates_row_major_tables(self):
+        users = create_users()
+        assert inflate(serialize_rows(users)) == [
+            user.as_json() for user in users
+        ]
+
+    def test_inflates_column_major_tables(self):
+        users = create_users()
+        assert inflate(serialize_columns(users)) == [
+            user.as_json() for user in users
+        ]
+
+    def test_drop_missing(self):
+        users = create_users()
+        users[1].born = empty
+        assert inflate(serialize_rows(users), drop_missing=True) == [
+            user.as_json() for user in users
+        ]
+
+    def test_drop_missing_drops_none_values_by_default(self):
+        users = create_users()
+        users[0].born = empty
+        assert inflate(serialize_rows(users), drop_missing=True) == [
+            {'id': 1, 'name': 'John'},
+            {'id': 2, 'name': 'Jack'}
+        ]
+
+    def test_drop_missing_with_distinct_missing_value(self):
+        users = create_users()
+        users[0].born = empty
+        table = serialize_rows(users, missing='-')
+        assert inflate(table, missing='-', drop_missing=True) == [
+            {'id': 1, 'name': 'John'},
+            {'id': 2, 'name': 'Jack', 'born': None}
+        ]
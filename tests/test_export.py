@@ -0,0 +1,120 @@
+import gzip
+import json
+import zlib
+from io import BytesIO
+
+import pytest
+
+from serializer import Serializable, SerializeOptions
+from serializer.export import export_ndjson
+
+
+class User(Serializable):
+    def __init__(self, id):
+        self.id = id
+        self.name = 'User\n%d' % id
+
+    def attributes(self):
+        return ['id', 'name']
+
+
+def users(count):
+    for index in range(count):
+        yield User(index)
+
+
+def read_lines(data):
+    return [json.loads(line) for line in data.decode('utf-8').splitlines()]
+
+
+class TestExportNDJSON(object):
+    def test_writes_one_object_per_line(self):
+        fp = BytesIO()
+        stats = export_ndjson(users(3), fp, only=['id', 'name'])
+        assert read_lines(fp.getvalue()) == [
+            {'id': 0, 'name': 'User\n0'},
+            {'id': 1, 'name': 'User\n1'},
+            {'id': 2, 'name': 'User\n2'},
+        ]
+        assert stats.objects == 3
+        assert stats.bytes == stats.compressed_bytes == len(fp.getvalue())
+
+    def test_gzip_to_path(self, tmp_path):
+        path = tmp_path / 'users.ndjson.gz'
+        stats = export_ndjson(
+            users(100), str(path), compression='gzip', buffer_size=64
+        )
+        with gzip.open(str(path), 'rb') as fp:
+            data = fp.read()
+        assert len(read_lines(data)) == 100
+        assert stats.bytes == len(data)
+        assert stats.compressed_bytes == path.stat().st_size
+        assert stats.compressed_bytes < stats.bytes
+
+    def test_zlib(self):
+        fp = BytesIO()
+        export_ndjson(users(50), fp, compression='zlib', buffer_size=100)
+        assert read_lines(zlib.decompress(fp.getvalue()))[49]['id'] == 49
+
+    def test_progress(self):
+        calls = []
+        stats = export_ndjson(
+            users(25),
+            BytesIO(),
+            progress=lambda stats: calls.append(stats.objects),
+            progress_every=10
+        )
+        assert calls == [10, 20, 25]
+        assert stats.elapsed > 0
+        assert stats.objects_per_second > 0
+
+    def test_progress_is_reported_once_for_the_last_object(self):
+        calls = []
+        export_ndjson(
+            users(20),
+            BytesIO(),
+            progress=lambda stats: calls.append(stats.objects),
+            progress_every=10
+        )
+        assert calls == [10, 20]
+
+    def test_progress_without_objects(self):
+        calls = []
+        export_ndjson(
+            users(0), BytesIO(), progress=lambda stats: calls.append(stats)
+        )
+        assert len(calls) == 1
+        assert calls[0].objects == 0
+
+    def test_progress_counts_buffered_bytes(self):
+        calls = []
+        fp = BytesIO()
+        export_ndjson(
+            users(25),
+            fp,
+            progress=lambda stats: calls.append(
+                (stats.objects, stats.bytes, stats.compressed_bytes)
+            ),
+            progress_every=10
+        )
+        lines = fp.getvalue().splitlines(True)
+        assert calls[0] == (10, len(b''.join(lines[:10])), 0)
+        assert calls[1] == (20, len(b''.join(lines[:20])), 0)
+        assert calls[2] == (25, len(fp.getvalue()), len(fp.getvalue()))
+
+    def test_options(self):
+        fp = BytesIO()
+        export_ndjson(
+            users(2), fp, options=SerializeOptions(
+                only=['name as n'], sort_keys=True
+            )
+        )
+        assert read_lines(fp.getvalue()) == [
+            {'n': 'User\n0'}, {'n': 'User\n1'}
+        ]
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            export_ndjson([], BytesIO(), compression='bz2')
+        with pytest.raises(ValueError):
+            export_ndjson([], BytesIO(), options=SerializeOptions(indent=2))
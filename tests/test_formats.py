@@ -0,0 +1,150 @@
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from serializer import OBJECT_DUMPERS, Serializable, empty, register_dumper
+from serializer.formats import FORMATS, register_format, serialize_native
+
+
+class Team(Serializable):
+    def attributes(self):
+        return ['name', 'founded']
+
+
+class User(Serializable):
+    def attributes(self):
+        return ['name', 'created_at', 'balance', 'team', 'tags', 'missing']
+
+
+class Money(object):
+    def __init__(self, amount):
+        self.amount = amount
+
+
+class Order(Serializable):
+    def attributes(self):
+        return ['extra']
+
+
+def create_order():
+    order = Order()
+    order.extra = {'price': Money(5), 'note': empty, 'items': [Money(1)]}
+    return order
+
+
+EXPECTED_EXTRA = {'price': 5, 'note': None, 'items': [1]}
+
+
+def create_user():
+    user = User()
+    user.name = 'John'
+    user.created_at = datetime(2011, 1, 1, 12, 30)
+    user.balance = Decimal('10.25')
+    user.team = Team()
+    user.team.name = 'Team A'
+    user.team.founded = date(2000, 1, 1)
+    user.tags = ('a', 'b')
+    user.missing = empty
+    return user
+
+
+class TestSerializeNative(object):
+    def test_leaves_native_types_untouched(self):
+        assert serialize_native(create_user()) == {
+            'name': 'John',
+            'created_at': datetime(2011, 1, 1, 12, 30),
+            'balance': Decimal('10.25'),
+            'team': {'name': 'Team A', 'founded': date(2000, 1, 1)},
+            'tags': ['a', 'b'],
+        }
+
+    def test_supports_specs(self):
+        assert serialize_native(
+            create_user(), only=[('team', {'only': ['founded']})]
+        ) == {'team': {'founded': date(2000, 1, 1)}}
+
+
+class TestMsgpack(object):
+    def test_roundtrip(self):
+        msgpack = pytest.importorskip('msgpack')
+        data = msgpack.unpackb(create_user().to_msgpack(), timestamp=3)
+        assert data == {
+            'name': 'John',
+            'created_at': datetime(
+                2011, 1, 1, 12, 30, tzinfo=timezone.utc
+            ),
+            'balance': '10.25',
+            'team': {'name': 'Team A', 'founded': '2000-01-01'},
+            'tags': ['a', 'b'],
+        }
+
+    def test_raw_values_are_encoded_like_json(self):
+        msgpack = pytest.importorskip('msgpack')
+        register_dumper(Money, lambda value, args: value.amount)
+        try:
+            order = create_order()
+            assert msgpack.unpackb(order.to_msgpack()) == {
+                'extra': EXPECTED_EXTRA
+            }
+            assert json.loads(order.to_json()) == {'extra': EXPECTED_EXTRA}
+        finally:
+            del OBJECT_DUMPERS[Money]
+
+    def test_unknown_values(self):
+        pytest.importorskip('msgpack')
+        with pytest.raises(TypeError):
+            create_order().to_msgpack()
+
+
+class TestCbor(object):
+    def test_roundtrip(self):
+        cbor2 = pytest.importorskip('cbor2')
+        data = cbor2.loads(create_user().to_cbor(only=['created_at']))
+        assert data == {
+            'created_at': datetime(2011, 1, 1, 12, 30, tzinfo=timezone.utc)
+        }
+        data = cbor2.loads(create_user().to_cbor(exclude=['created_at']))
+        assert data['balance'] == Decimal('10.25')
+        assert data['team']['founded'] == date(2000, 1, 1)
+
+    def test_raw_values_are_encoded_like_json(self):
+        cbor2 = pytest.importorskip('cbor2')
+        register_dumper(Money, lambda value, args: value.amount)
+        try:
+            assert cbor2.loads(create_order().to_cbor()) == {
+                'extra': EXPECTED_EXTRA
+            }
+        finally:
+            del OBJECT_DUMPERS[Money]
+
+    def test_unknown_values(self):
+        pytest.importorskip('cbor2')
+        with pytest.raises(TypeError):
+            create_order().to_cbor()
+
+
+class TestFormatRegistry(object):
+    def teardown_method(self, method):
+        FORMATS.pop('names', None)
+
+    def test_builtin_formats(self):
+        user = create_user()
+        assert user.to_format('json', only=['name']) == '{"name": "John"}'
+        assert user.to_format('xml', only=['name']) == (
+            '<?xml version="1.0" ?>\n<name>John</name>\n'
+        )
+
+    def test_register_format(self):
+        register_format(
+            'names',
+            lambda obj, **kwargs: ','.join(sorted(obj.as_json(**kwargs)))
+        )
+        assert create_user().to_format('names', only=['name', 'tags']) == (
+            'name,tags'
+        )
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            create_user().to_format('yaml')
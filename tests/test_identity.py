@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+from serializer import (
+    Serializable,
+    SerializationCycleError,
+    serialize_many,
+    track_identity,
+)
+
+
+class Team(Serializable):
+    def attributes(self):
+        return ['id', 'name']
+
+
+class User(Serializable):
+    def attributes(self):
+        return ['id', 'name', 'team']
+
+
+class Node(Serializable):
+    def attributes(self):
+        return ['name', 'parent']
+
+
+def create_users(count=3):
+    team = Team()
+    team.id = 1
+    team.name = 'Team A'
+    users = []
+    for index in range(count):
+        user = User()
+        user.id = index
+        user.name = 'User %d' % index
+        user.team = team
+        users.append(user)
+    return users
+
+
+class TestTrackIdentity(object):
+    def test_reuses_serialized_objects(self):
+        users = create_users()
+        with track_identity():
+            serialized = serialize_many(users)
+        assert serialized[0]['team'] == {'id': 1, 'name': 'Team A'}
+        assert serialized[0]['team'] is serialized[2]['team']
+
+    def test_different_specs_are_serialized_separately(self):
+        users = create_users(1)
+        with track_identity():
+            serialized = users[0].as_json(
+                include=[('team as team_name', {'only': ['name']})]
+            )
+        assert serialized['team'] == {'id': 1, 'name': 'Team A'}
+        assert serialized['team_name'] == {'name': 'Team A'}
+
+    def test_emits_references_for_repeated_objects(self):
+        users = create_users()
+        with track_identity(reference=lambda obj: {'$ref': obj.id}):
+            serialized = serialize_many(users)
+        assert serialized[0]['team'] == {'id': 1, 'name': 'Team A'}
+        assert serialized[1]['team'] == {'$ref': 1}
+
+    def test_detects_cycles(self):
+        a = Node()
+        a.name = 'a'
+        b = Node()
+        b.name = 'b'
+        a.parent = b
+        b.parent = a
+        with track_identity():
+            with pytest.raises(SerializationCycleError):
+                a.as_json()
+
+    def test_finite_spec_revisiting_ancestors(self):
+        a = Node()
+        a.name = 'a'
+        b = Node()
+        b.name = 'b'
+        a.parent = b
+        b.parent = a
+        spec = ['name', ('parent', {'only': [
+            'name', ('parent', {'only': ['name']})
+        ]})]
+        expected = a.as_json(only=spec)
+        with track_identity():
+            assert a.as_json(only=spec) == expected
+        assert expected == {
+            'name': 'a', 'parent': {'name': 'b', 'parent': {'name': 'a'}}
+        }
+
+    def test_emits_references_for_cycles(self):
+        a = Node()
+        a.name = 'a'
+        a.parent = a
+        with track_identity(reference=lambda obj: obj.name):
+            assert a.as_json() == {'name': 'a', 'parent': 'a'}
+
+    def test_streaming_encoder(self):
+        a = Node()
+        a.name = 'a'
+        a.parent = a
+        with track_identity(reference=lambda obj: obj.name):
+            assert json.loads(''.join(a.iter_json())) == {
+                'name': 'a', 'parent': 'a'
+            }
+
+    def test_state_is_discarded_after_block(self):
+        users = create_users(2)
+        with track_identity():
+            first = users[0].as_json()
+        with track_identity():
+            second = users[0].as_json()
+        assert first['team'] is not second['team']
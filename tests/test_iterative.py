@@ -0,0 +1,104 @@
+import sys
+from datetime import datetime
+
+import pytest
+
+from benchmarks.models import build_graph, build_thread, include_spec
+from serializer import (
+    Field,
+    Schema,
+    SerializationCycleError,
+    SerializationDepthError,
+    Serializable,
+    empty,
+    serialize,
+    serialize_iterative,
+    track_identity,
+)
+
+
+class Team(Schema):
+    name = Field(str, alias='title')
+    founded = Field(datetime)
+
+
+class User(Serializable):
+    def __init__(self, name, team=None, friends=()):
+        self.name = name
+        self.team = team
+        self.friends = list(friends)
+        self.tags = ('a', 'b')
+
+    def attributes(self):
+        return ['name', 'team', 'missing', 'hidden', 'tags']
+
+    def hidden(self):
+        return empty
+
+    def friend_names(self):
+        return (friend.name for friend in self.friends)
+
+
+def create_users():
+    team = Team(name='Team A', founded=datetime(2011, 1, 1))
+    jack = User('Jack', team)
+    return [User('John', team, [jack]), jack, User('Jill')]
+
+
+SPECS = [
+    {},
+    {'only': ['name', 'friend_names']},
+    {'include': [('friends', {'include': ['friends']})]},
+    {'exclude': ['team'], 'include': [('team', {'only': ['founded']})]},
+]
+
+
+class TestSerializeIterative(object):
+    @pytest.mark.parametrize('spec', SPECS)
+    def test_output_equals_recursive_engine(self, spec):
+        users = create_users()
+        assert serialize_iterative(users, **spec) == [
+            serialize(user, **spec) for user in users
+        ]
+        assert serialize_iterative(users[0], **spec) == serialize(
+            users[0], **spec
+        )
+
+    def test_include_trees(self):
+        obj = build_graph(width=8, depth=4, list_size=3)
+        spec = include_spec(4)
+        assert serialize_iterative(obj, include=spec) == serialize(
+            obj, include=spec
+        )
+
+    def test_scalar_values(self):
+        assert serialize_iterative(5) == 5
+        assert serialize_iterative(datetime(2011, 1, 1)) == (
+            '2011-01-01T00:00:00Z'
+        )
+
+    def test_deeper_than_recursion_limit(self):
+        depth = sys.getrecursionlimit() * 2
+        serialized = serialize_iterative(build_thread(depth))
+        for level in range(depth - 1):
+            serialized = serialized['replies'][0]
+        assert serialized['id'] == depth - 1
+        assert serialized['replies'] == []
+
+    def test_max_depth(self):
+        assert serialize_iterative(build_thread(3), max_depth=3)
+        with pytest.raises(SerializationDepthError):
+            serialize_iterative(build_thread(4), max_depth=3)
+
+    def test_lists_do_not_count_as_levels(self):
+        users = create_users()
+        assert serialize_iterative(users, max_depth=2)
+        with pytest.raises(SerializationDepthError):
+            serialize_iterative(users, max_depth=1)
+
+    def test_identity_tracking_uses_recursive_engine(self):
+        user = User('John')
+        user.team = user
+        with pytest.raises(SerializationCycleError):
+            with track_identity():
+                serialize_iterative(user)
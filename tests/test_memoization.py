@@ -0,0 +1,112 @@
+import time
+
+from serializer import (
+    Serializable,
+    cached_attribute,
+    memoize,
+    serialize_many,
+)
+
+
+class Team(Serializable):
+    calls = 0
+
+    def attributes(self):
+        return ['name', 'member_count']
+
+    def member_count(self):
+        Team.calls += 1
+        return 5
+
+
+class User(Serializable):
+    calls = 0
+
+    def attributes(self):
+        return ['name', 'team']
+
+    def attribute_sets(self):
+        return {'stats': ['score', 'score as points']}
+
+    @cached_attribute(ttl=60, maxsize=2)
+    def score(self):
+        User.calls += 1
+        return 10
+
+
+def create_users(team, count=3):
+    users = []
+    for index in range(count):
+        user = User()
+        user.name = 'User %d' % index
+        user.team = team
+        users.append(user)
+    return users
+
+
+class TestMemoize(object):
+    def setup_method(self, method):
+        Team.calls = 0
+
+    def test_methods_are_called_once_per_object(self):
+        team = Team()
+        team.name = 'Team A'
+        users = create_users(team)
+        with memoize():
+            serialized = serialize_many(users)
+        assert serialized[2]['team'] == {'name': 'Team A', 'member_count': 5}
+        assert Team.calls == 1
+
+    def test_memo_is_discarded_after_block(self):
+        team = Team()
+        with memoize():
+            team.as_json()
+        with memoize():
+            team.as_json()
+        assert Team.calls == 2
+
+    def test_without_memoize_methods_are_called_every_time(self):
+        team = Team()
+        serialize_many(create_users(team))
+        assert Team.calls == 3
+
+
+class TestCachedAttribute(object):
+    def setup_method(self, method):
+        User.calls = 0
+        User.score.clear()
+
+    def test_caches_results_across_passes(self):
+        user = User()
+        assert user.as_json(only='stats') == {'score': 10, 'points': 10}
+        assert user.as_json(only='stats') == {'score': 10, 'points': 10}
+        assert User.calls == 1
+
+    def test_invalidate(self):
+        user = User()
+        user.score()
+        User.score.invalidate(user)
+        user.score()
+        assert User.calls == 2
+
+    def test_size_bound(self):
+        users = [User() for i in range(3)]
+        for user in users:
+            user.score()
+        users[0].score()
+        assert User.calls == 4
+
+    def test_ttl(self):
+        class Model(Serializable):
+            calls = 0
+
+            @cached_attribute(ttl=0.01)
+            def value(self):
+                Model.calls += 1
+                return Model.calls
+
+        obj = Model()
+        assert obj.value() == 1
+        assert obj.value() == 1
+        time.sleep(0.02)
+        assert obj.value() == 2
@@ -0,0 +1,132 @@
+import json
+from datetime import datetime
+
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+from serializer import OBJECT_DUMPERS, Serializable, serialize  # noqa
+from serializer.numeric import (  # noqa
+    dump_ndarray,
+    register_dumpers,
+    unregister_dumpers,
+)
+
+
+class Measurement(Serializable):
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+    def attributes(self):
+        return list(self.__dict__)
+
+
+@pytest.fixture
+def dumpers():
+    register_dumpers()
+    yield
+    unregister_dumpers()
+
+
+def dump(value):
+    return serialize(Measurement(value=value))['value']
+
+
+class TestNumpy(object):
+    def test_integer_and_boolean_arrays(self, dumpers):
+        assert dump(numpy.arange(3, dtype=numpy.int32)) == [0, 1, 2]
+        assert dump(numpy.array([[True], [False]])) == [[True], [False]]
+
+    def test_scalars(self, dumpers):
+        assert type(dump(numpy.int64(5))) is int
+        assert dump(numpy.bool_(True)) is True
+        assert dump(numpy.float32(0.5)) == 0.5
+        assert dump(numpy.float64('nan')) is None
+
+    def test_nan_policies(self, dumpers):
+        values = numpy.array([1.5, numpy.nan, numpy.inf, -numpy.inf])
+        assert dump(values) == [1.5, None, None, None]
+        register_dumpers(nan='string')
+        assert dump(values) == [1.5, 'NaN', 'Infinity', '-Infinity']
+        register_dumpers(nan='raise')
+        with pytest.raises(ValueError):
+            dump(values)
+        register_dumpers(nan='keep')
+        assert dump(values)[2] == float('inf')
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            register_dumpers(nan='zero')
+
+    def test_datetime64(self, dumpers):
+        values = numpy.array(
+            ['2011-01-01T10:30:15.5', 'NaT'], dtype='datetime64[ms]'
+        )
+        assert dump(values) == ['2011-01-01T10:30:15Z', None]
+        assert dump(numpy.datetime64('2011-01-02')) == '2011-01-02'
+        assert dump(values[0]) == '2011-01-01T10:30:15Z'
+
+    def test_nat_scalars(self, dumpers):
+        assert dump(numpy.datetime64('NaT')) is None
+        assert dump(numpy.datetime64('NaT', 'ms')) is None
+        assert dump(numpy.timedelta64('NaT')) is None
+
+    def test_timedelta64(self, dumpers):
+        values = numpy.array([1500, 'NaT'], dtype='timedelta64[ms]')
+        assert dump(values) == [1.5, None]
+        assert dump(numpy.timedelta64(2, 'm')) == 120.0
+
+    def test_complex_values_are_not_supported(self, dumpers):
+        with pytest.raises(TypeError):
+            dump(numpy.array([1 + 2j]))
+        with pytest.raises(TypeError):
+            dump(numpy.complex128(1 + 2j))
+
+    def test_object_arrays_are_dumped_elementwise(self, dumpers):
+        values = numpy.array([datetime(2011, 1, 1), None], dtype=object)
+        assert dump(values) == ['2011-01-01T00:00:00Z', None]
+
+    def test_json_encoding(self, dumpers):
+        assert json.loads(Measurement(value=numpy.ones(2)).to_json()) == {
+            'value': [1.0, 1.0]
+        }
+
+    def test_unregister(self):
+        register_dumpers()
+        unregister_dumpers()
+        assert OBJECT_DUMPERS.resolve(numpy.ndarray) is not dump_ndarray
+        assert OBJECT_DUMPERS.resolve(numpy.int64) is None
+
+
+class TestPandas(object):
+    def setup_method(self, method):
+        self.pandas = pytest.importorskip('pandas')
+
+    def test_dataframe_records(self, dumpers):
+        frame = self.pandas.DataFrame({
+            'id': [1, 2],
+            'score': [0.5, numpy.nan],
+            'name': ['John', None],
+            'born': self.pandas.to_datetime(['1990-01-02', None]),
+        })
+        assert dump(frame) == [
+            {'id': 1, 'score': 0.5, 'name': 'John',
+             'born': '1990-01-02T00:00:00Z'},
+            {'id': 2, 'score': None, 'name': None, 'born': None},
+        ]
+
+    def test_dataframe_columns(self):
+        register_dumpers(orient='columns')
+        try:
+            frame = self.pandas.DataFrame({'id': [1, 2], 'n': [3, 4]})
+            assert dump(frame) == {'id': [1, 2], 'n': [3, 4]}
+        finally:
+            unregister_dumpers()
+
+    def test_series_and_scalars(self, dumpers):
+        series = self.pandas.Series([1, None], dtype='Int64')
+        assert dump(series) == [1, None]
+        assert dump(self.pandas.Timestamp('2011-01-01 10:00')) == (
+            '2011-01-01T10:00:00Z'
+        )
+        assert dump(self.pandas.NaT) is None
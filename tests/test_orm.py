@@ -0,0 +1,152 @@
+import pytest
+
+sa = pytest.importorskip('sqlalchemy')
+
+from sqlalchemy import ForeignKey, String, create_engine, event, select  # noqa
+from sqlalchemy.orm import (  # noqa
+    DeclarativeBase,
+    Mapped,
+    Session,
+    deferred,
+    mapped_column,
+    relationship,
+)
+
+from serializer import Serializable, serialize_many  # noqa
+from serializer.orm import loader_options, serialize_query  # noqa
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class User(Base, Serializable):
+    __tablename__ = 'user'
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(50))
+    email: Mapped[str] = mapped_column(String(50))
+    bio: Mapped[str] = deferred(mapped_column(String(200)))
+    posts = relationship('Post', back_populates='author')
+
+    def attributes(self):
+        return ['id', 'name', 'email']
+
+    def display_name(self):
+        return '%s <%s>' % (self.name, self.email)
+
+
+class Post(Base, Serializable):
+    __tablename__ = 'post'
+    id: Mapped[int] = mapped_column(primary_key=True)
+    title: Mapped[str] = mapped_column(String(50))
+    body: Mapped[str] = mapped_column(String(200))
+    author_id: Mapped[int] = mapped_column(ForeignKey('user.id'))
+    author = relationship('User', back_populates='posts')
+    comments = relationship('Comment')
+
+    def attributes(self):
+        return ['id', 'title', 'body']
+
+
+class Comment(Base, Serializable):
+    __tablename__ = 'comment'
+    id: Mapped[int] = mapped_column(primary_key=True)
+    body: Mapped[str] = mapped_column(String(200))
+    post_id: Mapped[int] = mapped_column(ForeignKey('post.id'))
+
+    def attributes(self):
+        return ['id', 'body']
+
+
+SPEC = dict(
+    only=['name'],
+    include=[
+        ('posts', {
+            'only': ['title'],
+            'include': [('comments', {'only': ['body']})]
+        })
+    ]
+)
+
+
+class QueryCounter(object):
+    def __init__(self, engine):
+        self.statements = []
+        event.listen(engine, 'before_cursor_execute', self.record)
+
+    def record(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+
+def create_session(users):
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    for index in range(users):
+        user = User(
+            name='User %d' % index,
+            email='user%d@example.com' % index,
+            bio='...'
+        )
+        for post_index in range(3):
+            post = Post(title='Post %d' % post_index, body='...')
+            post.comments = [Comment(body='Comment'), Comment(body='Nice')]
+            user.posts.append(post)
+        session.add(user)
+    session.commit()
+    session.expunge_all()
+    return session, QueryCounter(engine)
+
+
+class TestLoaderOptions(object):
+    @pytest.mark.parametrize('users', [2, 20])
+    def test_fixed_number_of_queries(self, users):
+        session, counter = create_session(users)
+        statement = select(User).options(*loader_options(User, **SPEC))
+        serialized = serialize_many(session.scalars(statement).all(), **SPEC)
+        assert len(serialized) == users
+        assert serialized[0]['posts'][0] == {
+            'title': 'Post 0',
+            'comments': [{'body': 'Comment'}, {'body': 'Nice'}]
+        }
+        assert len(counter.statements) == 3
+
+    def test_lazy_loading_without_options(self):
+        session, counter = create_session(5)
+        serialize_many(session.scalars(select(User)).all(), **SPEC)
+        assert len(counter.statements) > 3
+
+    def test_restricts_loaded_columns(self):
+        session, counter = create_session(1)
+        serialize_query(session, select(User), **SPEC)
+        users, posts, comments = counter.statements
+        assert 'email' not in users
+        assert 'body' not in posts
+        assert 'post_id' in comments
+
+    def test_unmapped_attributes_disable_column_restriction(self):
+        session, counter = create_session(1)
+        serialized = serialize_query(
+            session, select(User), only=['display_name', 'bio']
+        )
+        assert serialized == [
+            {'display_name': 'User 0 <user0@example.com>', 'bio': '...'}
+        ]
+        assert len(counter.statements) == 1
+
+    def test_many_to_one(self):
+        session, counter = create_session(3)
+        serialized = serialize_query(
+            session,
+            select(Post),
+            only=['title', ('author', {'only': ['name']})],
+            strategy='joined'
+        )
+        assert serialized[-1] == {'title': 'Post 2', 'author': {
+            'name': 'User 2'
+        }}
+        assert len(counter.statements) == 1
+
+    def test_unknown_strategy(self):
+        with pytest.raises(ValueError):
+            loader_options(User, strategy='lazy')
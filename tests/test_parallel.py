@@ -0,0 +1,70 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from serializer import Serializable, SerializeOptions
+from serializer.parallel import (
+    chunked,
+    iter_serialize_parallel,
+    serialize_parallel,
+)
+
+
+class User(Serializable):
+    def __init__(self, id):
+        self.id = id
+        self.name = 'User %d' % id
+
+    def attributes(self):
+        return ['id', 'name']
+
+
+def create_users(count):
+    return [User(index) for index in range(count)]
+
+
+class TestSerializeParallel(object):
+    @pytest.mark.parametrize('executor', ['process', 'thread'])
+    def test_returns_results_in_order(self, executor):
+        users = create_users(100)
+        serialized = serialize_parallel(
+            users, only=['id'], workers=2, chunk_size=7, executor=executor
+        )
+        assert serialized == [{'id': index} for index in range(100)]
+
+    def test_single_worker(self):
+        assert serialize_parallel(create_users(3), workers=1) == [
+            {'id': 0, 'name': 'User 0'},
+            {'id': 1, 'name': 'User 1'},
+            {'id': 2, 'name': 'User 2'},
+        ]
+
+    def test_existing_executor_and_options(self):
+        options = SerializeOptions(only=['name'])
+        with ThreadPoolExecutor(2) as executor:
+            serialized = list(iter_serialize_parallel(
+                iter(create_users(10)),
+                options=options,
+                chunk_size=3,
+                executor=executor
+            ))
+        assert serialized[9] == {'name': 'User 9'}
+        assert len(serialized) == 10
+
+    def test_unknown_executor(self):
+        with pytest.raises(ValueError):
+            serialize_parallel(create_users(1), workers=2, executor='gpu')
+
+
+class TestChunked(object):
+    def test_splits_iterables(self):
+        assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+class TestSerializeOptionsPickling(object):
+    def test_roundtrip(self):
+        options = SerializeOptions(
+            only=['id', ('team', {'only': ['name']})], sort_keys=True
+        )
+        assert pickle.loads(pickle.dumps(options)) == options
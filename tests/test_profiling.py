@@ -0,0 +1,109 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+import serializer
+from serializer import SerializationPlan, Serializable
+from serializer.profiling import profile
+
+
+class Team(Serializable):
+    def attributes(self):
+        return ['name']
+
+
+class User(Serializable):
+    def attributes(self):
+        return ['name', 'created_at', 'team', 'score']
+
+    def score(self):
+        return 10
+
+
+def create_user():
+    user = User()
+    user.name = 'John'
+    user.created_at = datetime(2011, 1, 1)
+    user.team = Team()
+    user.team.name = 'Team A'
+    return user
+
+
+class TestProfile(object):
+    def test_records_attributes(self):
+        user = create_user()
+        with profile() as report:
+            user.as_json()
+            user.as_json()
+        assert report.attributes[('User', 'name')].count == 2
+        assert report.attributes[('Team', 'name')].count == 2
+        assert report.attributes[('User', 'score')].call_time > 0
+        assert report.attributes[('User', 'name')].call_time == 0
+
+    def test_records_dumpers(self):
+        user = create_user()
+        with profile() as report:
+            user.as_json()
+        assert report.dumpers['dump_serializable(Team)'].count == 1
+        assert report.dumpers['dump_datetime(datetime)'].count == 1
+
+    def test_records_encoding(self):
+        user = create_user()
+        with profile() as report:
+            result = user.to_json(only=['name'])
+        assert result == '{"name": "John"}'
+        assert report.encoding.count == 1
+
+    def test_report_formatting(self):
+        with profile() as report:
+            create_user().as_json()
+        assert 'User.name' in str(report)
+
+    def test_restores_original_functions(self):
+        dump_object = serializer.dump_object
+        plan_call = SerializationPlan.__call__
+        with profile():
+            assert serializer.dump_object is not dump_object
+        assert serializer.dump_object is dump_object
+        assert SerializationPlan.__call__ is plan_call
+
+    def test_does_not_nest(self):
+        with profile():
+            with pytest.raises(RuntimeError):
+                with profile():
+                    pass
+
+    def test_other_threads_are_not_profiled(self):
+        results = []
+        thread = threading.Thread(
+            target=lambda: results.append(create_user().to_json())
+        )
+        with profile() as report:
+            thread.start()
+            thread.join()
+        assert len(results) == 1
+        assert report.attributes == {}
+        assert report.encoding.count == 0
+
+    def test_concurrent_profiles(self):
+        started = threading.Barrier(2, timeout=5)
+        reports = []
+
+        def run():
+            with profile() as report:
+                started.wait()
+                create_user().as_json(only=['name'])
+                started.wait()
+            reports.append(report)
+
+        dump_object = serializer.dump_object
+        thread = threading.Thread(target=run)
+        thread.start()
+        with profile() as report:
+            started.wait()
+            started.wait()
+        thread.join()
+        assert report.attributes == {}
+        assert reports[0].attributes[('User', 'name')].count == 1
+        assert serializer.dump_object is dump_object
@@ -0,0 +1,137 @@
+import json
+import weakref
+from datetime import date, datetime
+
+import pytest
+
+from serializer import (
+    Field,
+    Schema,
+    Serializable,
+    compile_plan,
+    invalidate_plans,
+    serialize_many,
+)
+from serializer.formats import serialize_native
+
+
+class Team(Schema):
+    id = Field(int)
+    name = Field(str)
+
+
+class User(Schema):
+    id = Field(int)
+    name = Field(str, alias='full_name')
+    born = Field(date)
+    created_at = Field(datetime, dumper=lambda value, args: value.year)
+    role = Field(str, default='member')
+    team = Field(Team)
+
+    def attribute_sets(self):
+        return {'short': ['id', 'name']}
+
+    def initials(self):
+        return self.name[0]
+
+
+class Admin(User):
+    level = Field(int, default=1)
+
+
+class TestSchema(object):
+    def setup_method(self, method):
+        invalidate_plans()
+
+    def test_declared_fields(self):
+        assert list(User.__fields__) == [
+            'id', 'name', 'born', 'created_at', 'role', 'team'
+        ]
+        assert User.__fields__['name'].name == 'name'
+
+    def test_instances_use_slots(self):
+        user = User(id=1)
+        assert not hasattr(user, '__dict__')
+        with pytest.raises(AttributeError):
+            user.nickname = 'Johnny'
+
+    def test_instances_support_weak_references(self):
+        user = User(id=1)
+        assert weakref.ref(user)() is user
+
+    def test_unknown_keyword_argument(self):
+        with pytest.raises(TypeError):
+            User(nickname='Johnny')
+
+    def test_as_json(self):
+        user = User(
+            id=1,
+            name='John',
+            born=date(1990, 1, 2),
+            created_at=datetime(2011, 1, 1),
+            team=Team(id=2, name='Team A')
+        )
+        assert user.as_json() == {
+            'id': 1,
+            'full_name': 'John',
+            'born': '1990-01-02',
+            'created_at': 2011,
+            'role': 'member',
+            'team': {'id': 2, 'name': 'Team A'}
+        }
+
+    def test_fields_without_value_are_left_out(self):
+        assert User(id=1).as_json() == {'id': 1, 'role': 'member'}
+
+    def test_none_values_skip_the_field_dumper(self):
+        assert User(id=1, created_at=None).as_json(only=['created_at']) == {
+            'created_at': None
+        }
+
+    def test_spec_arguments(self):
+        user = User(id=1, name='John')
+        assert user.as_json(only=['name as n'], include=['initials']) == {
+            'n': 'John', 'initials': 'J'
+        }
+        assert user.as_json(only='short') == {'id': 1, 'full_name': 'John'}
+        assert user.as_json(exclude=['role']) == {'id': 1, 'full_name': 'John'}
+
+    def test_inherited_fields(self):
+        assert list(Admin.__fields__)[-1] == 'level'
+        assert Admin(id=1).as_json() == {'id': 1, 'role': 'member', 'level': 1}
+
+    def test_field_dumpers_are_resolved_in_plan(self):
+        user = User(id=1, born=date(1990, 1, 2))
+        steps = dict(
+            (attr, args) for attr, alias, args in compile_plan(user).steps
+        )
+        assert steps['born'].dumper is not None
+        assert steps['id'].dumper is None
+        assert not hasattr(steps['team'], 'dumper')
+
+    def test_serialize_many_and_json(self):
+        users = [User(id=1, name='John'), User(id=2, name='Jack')]
+        assert [item['full_name'] for item in serialize_many(users)] == [
+            'John', 'Jack'
+        ]
+        assert json.loads(users[0].to_json(only=['id'])) == {'id': 1}
+        assert json.loads(''.join(users[0].iter_json(only=['name']))) == {
+            'full_name': 'John'
+        }
+
+    def test_native_formats_keep_declared_types(self):
+        user = User(born=date(1990, 1, 2), created_at=datetime(2011, 1, 1))
+        assert serialize_native(user, only=['born', 'created_at']) == {
+            'born': date(1990, 1, 2),
+            'created_at': 2011
+        }
+
+    def test_method_api_keeps_working(self):
+        class Post(Serializable):
+            def __init__(self, title):
+                self.title = title
+
+            def attributes(self):
+                return ['title']
+
+        assert Post('Hello').as_json() == {'title': 'Hello'}
@@ -1,5 +1,26 @@
+import weakref
+from collections.abc import Iterable, Mapping
 from datetime import datetime, date
-from serializer import Serializable, empty
+
+import pytest
+
+from serializer import (
+    DumperRegistry,
+    LRUCache,
+    PLAN_CACHE,
+    SerializeOptions,
+    Serializable,
+    cleanup,
+    compile_args,
+    compile_plan,
+    dump_object,
+    empty,
+    invalidate_plans,
+    nested_plan,
+    serialize,
+    serialize_iterable,
+    serialize_many
+)
 
 
 class Team(Serializable):
@@ -79,6 +100,42 @@ class TestDumpTypes(object):
         }
         assert user.as_json(only=['dates']) == json
 
+    def test_supports_generic_iterables(self):
+        user = User()
+        user.dates = (date(2011, 1, 1), )
+        user.numbers = (number for number in range(3))
+        user.tags = set(['a'])
+        assert user.as_json(only=['dates', 'numbers', 'tags']) == {
+            'dates': ['2011-01-01'],
+            'numbers': [0, 1, 2],
+            'tags': ['a']
+        }
+
+    def test_strings_and_dicts_are_not_treated_as_iterables(self):
+        user = User()
+        user.name = 'John'
+        user.data = {'a': 1}
+        user.raw = b'abc'
+        assert user.as_json(only=['name', 'data', 'raw']) == {
+            'name': 'John',
+            'data': {'a': 1},
+            'raw': b'abc'
+        }
+
+
+class TestSerializableSlots(object):
+    def test_bare_instances_support_weak_references(self):
+        obj = Serializable()
+        assert weakref.ref(obj)() is obj
+
+    def test_subclasses_without_slots_accept_attributes(self):
+        class Model(Serializable):
+            pass
+
+        obj = Model()
+        obj.name = 'John'
+        assert weakref.ref(obj)() is obj
+
 
 class TestSerializationParams(object):
     def setup_method(self, method):
@@ -167,3 +224,242 @@ class TestSerializationParams(object):
             user.to_xml(only=['name']) ==
             '<?xml version="1.0" ?>\n<name>Jack</name>\n'
         )
+
+
+class CountingUser(Serializable):
+    calls = 0
+
+    def attributes(self):
+        CountingUser.calls += 1
+        return ['name as username', 'team']
+
+    def attribute_sets(self):
+        return {'details': ['name', 'age']}
+
+
+class TestSerializationPlans(object):
+    def setup_method(self, method):
+        invalidate_plans()
+        CountingUser.calls = 0
+
+    def test_attributes_are_resolved_once_per_spec(self):
+        users = [CountingUser() for i in range(10)]
+        for index, user in enumerate(users):
+            user.name = 'User %d' % index
+            user.team = None
+        assert [user.as_json() for user in users][3] == {
+            'username': 'User 3', 'team': None
+        }
+        assert CountingUser.calls == 1
+
+    def test_nested_plans_are_cached(self):
+        user = CountingUser()
+        user.name = 'John'
+        team = Team()
+        team.name = 'Team A'
+        user.team = team
+        user.as_json(only=[('team', {'only': ['name']})])
+        user.as_json(only=[('team', {'only': ['name']})])
+        assert len([
+            key for key in PLAN_CACHE._data if key[0] is Team
+        ]) == 1
+
+    def test_supports_attribute_set_name_as_string(self):
+        user = CountingUser()
+        user.name = 'John'
+        user.age = 13
+        assert user.as_json(only='details') == {'name': 'John', 'age': 13}
+
+    def test_invalidate_plans_for_class(self):
+        user = CountingUser()
+        user.name = 'John'
+        user.as_json()
+        invalidate_plans(CountingUser)
+        user.as_json()
+        assert CountingUser.calls == 2
+
+    def test_nested_plan_reuses_compiled_plan(self):
+        team = Team()
+        args = compile_args({'only': ['name']})
+        plan = nested_plan(team, args)
+        assert nested_plan(team, args) is plan
+        assert compile_plan(team, only=['name']) is plan
+
+    def test_legacy_helpers(self):
+        user = CountingUser()
+        user.name = empty
+        user.age = 13
+        serialized = serialize_iterable(user, ['details'])
+        assert serialized == {'name': empty, 'age': 13}
+        assert cleanup(serialized) == {'age': 13}
+
+    def test_unhashable_specs_are_not_cached(self):
+        class UnhashableSpec(object):
+            __hash__ = None
+
+        user = User()
+        user.name = 'John'
+        spec = [('name', {'only': UnhashableSpec()})]
+        invalidate_plans(User)
+        cached = len(PLAN_CACHE)
+        assert serialize(user, only=spec) == {'name': 'John'}
+        assert compile_plan(user, only=spec) is not compile_plan(
+            user, only=spec
+        )
+        assert len(PLAN_CACHE) == cached
+
+
+class TestLRUCache(object):
+    def test_evicts_least_recently_used_entries(self):
+        cache = LRUCache(maxsize=2)
+        cache['a'] = 1
+        cache['b'] = 2
+        cache.get('a')
+        cache['c'] = 3
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert len(cache) == 2
+
+
+class Money(object):
+    def __init__(self, amount):
+        self.amount = amount
+
+
+class Euro(Money):
+    pass
+
+
+class TestDumperRegistry(object):
+    def test_class_dumpers_match_subclasses(self):
+        registry = DumperRegistry({Money: lambda a, b: a.amount})
+        assert registry.resolve(Euro)(Euro(5), {}) == 5
+
+    def test_class_name_dumpers_match_exact_class_only(self):
+        registry = DumperRegistry({'Money': lambda a, b: a.amount})
+        assert registry.resolve(Money) is not None
+        assert registry.resolve(Euro) is None
+
+    def test_exact_type_wins_over_base_class(self):
+        registry = DumperRegistry({
+            Money: lambda a, b: 'money',
+            Euro: lambda a, b: 'euro',
+        })
+        assert registry.resolve(Euro)(Euro(5), {}) == 'euro'
+
+    def test_registering_dumper_invalidates_cache(self):
+        registry = DumperRegistry()
+        assert registry.resolve(Euro) is None
+        registry[Money] = lambda a, b: a.amount
+        assert registry.resolve(Euro)(Euro(5), {}) == 5
+        del registry[Money]
+        assert registry.resolve(Euro) is None
+
+    def test_only_first_matching_dumper_is_applied(self):
+        assert dump_object(datetime(2011, 1, 1), {}) == '2011-01-01T00:00:00Z'
+
+    def test_abstract_base_classes(self):
+        registry = DumperRegistry({
+            Mapping: None,
+            Iterable: lambda a, b: list(a),
+        })
+        assert registry.resolve(dict) is None
+        assert registry.resolve(type(iter([])))(iter([1]), {}) == [1]
+
+    def test_none_stops_lookup(self):
+        registry = DumperRegistry({Money: lambda a, b: 1, Euro: None})
+        assert registry.resolve(Euro) is None
+
+    def test_values_without_dumper_are_returned_as_is(self):
+        money = Money(5)
+        assert dump_object(money, {}) is money
+        assert dump_object(None, {}) is None
+
+
+class TestSerializeMany(object):
+    def setup_method(self, method):
+        invalidate_plans()
+        CountingUser.calls = 0
+
+    def test_returns_list_of_dicts(self):
+        users = [User(), User()]
+        users[0].name = 'John'
+        users[1].name = 'Jack'
+        assert User.as_json_many(users, only=['name']) == [
+            {'name': 'John'}, {'name': 'Jack'}
+        ]
+
+    def test_supports_mixed_classes(self):
+        user = User()
+        user.name = 'John'
+        team = Team()
+        team.name = 'Team A'
+        assert serialize_many([user, team], only=['name']) == [
+            {'name': 'John'}, {'name': 'Team A'}
+        ]
+
+    def test_resolves_attributes_once(self):
+        users = [CountingUser() for i in range(5)]
+        for user in users:
+            user.name = 'John'
+            user.team = None
+        serialize_many(users)
+        assert CountingUser.calls == 1
+
+    def test_list_dumper_serializes_nested_objects(self):
+        user = User()
+        friend = User()
+        friend.name = 'Jack'
+        user.friends = [friend, 1]
+        assert user.as_json(only=[('friends', {'only': ['name']})]) == {
+            'friends': [{'name': 'Jack'}, 1]
+        }
+
+
+class TestSerializeOptions(object):
+    def test_to_json_passes_spec(self):
+        user = User()
+        user.name = 'Jack'
+        user.age = 13
+        assert user.to_json(exclude=['age', 'created_at']) == (
+            '{"name": "Jack"}'
+        )
+
+    def test_to_json_with_options(self):
+        user = User()
+        user.name = 'Jack'
+        user.age = 13
+        options = SerializeOptions(
+            only=['name', 'age'], sort_keys=True, separators=(',', ':')
+        )
+        assert user.to_json(options=options) == '{"age":13,"name":"Jack"}'
+        assert user.as_json(options=options) == {'name': 'Jack', 'age': 13}
+
+    def test_options_are_hashable(self):
+        options = SerializeOptions(
+            only=['name', ('team', {'only': ['name']})], sort_keys=True
+        )
+        same = SerializeOptions(
+            only=['name', ('team', {'only': ['name']})], sort_keys=True
+        )
+        assert options == same
+        assert hash(options) == hash(same)
+        assert options != SerializeOptions(only=['name'])
+        assert len(set([options, same])) == 1
+
+    def test_serialize_many(self):
+        users = [User(), User()]
+        users[0].name = 'John'
+        users[1].name = 'Jack'
+        options = SerializeOptions(only=['name'])
+        assert options.serialize_many(users) == [
+            {'name': 'John'}, {'name': 'Jack'}
+        ]
+
+    def test_validates_spec(self):
+        with pytest.raises(ValueError):
+            SerializeOptions(only=[1])
+        with pytest.raises(ValueError):
+            SerializeOptions(include=[('team', {'unknown': ['name']})])
+        with pytest.raises(ValueError):
+            SerializeOptions(include=[('team', {'only': 1})])
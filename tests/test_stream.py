@@ -0,0 +1,177 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+
+from serializer import Serializable, SerializeOptions, empty
+from serializer.backends import available_backends, set_json_backend
+from serializer.stream import dump_json, iterencode_json
+
+
+class Team(Serializable):
+    def attributes(self):
+        return ['name']
+
+
+class User(Serializable):
+    def attributes(self):
+        return ['name', 'created_at', 'team', 'friends']
+
+    def attribute_sets(self):
+        return {'basic': ['name', 'name as alias']}
+
+
+def create_user(name):
+    user = User()
+    user.name = name
+    user.created_at = datetime(2011, 1, 1)
+    user.team = Team()
+    user.team.name = 'Team %s' % name
+    user.friends = []
+    return user
+
+
+@pytest.fixture(params=available_backends())
+def backend(request):
+    return request.param
+
+
+class TestBackendOutput(object):
+    @pytest.mark.parametrize(('options', 'balance'), [
+        ({}, '12345678901234567890.12'),
+        ({'sort_keys': True}, '12345678901234567890.12'),
+        ({'indent': 2}, '12345678901234567890.12'),
+        ({'use_decimal': False}, '10.25'),
+    ])
+    def test_output_matches_backend(self, backend, options, balance):
+        user = create_user(u'Jäkki')
+        user.team = {
+            'balance': Decimal(balance),
+            'founded': date(2000, 1, 1),
+            'missing': empty,
+            'tags': ['a/b', u'é'],
+        }
+        user.friends = [create_user('Jack')]
+        options = SerializeOptions(backend=backend, **options)
+        assert ''.join(
+            user.iter_json(backend=backend, **options.encoder_options)
+        ) == user.to_json(options=options)
+
+    def test_uses_default_backend(self):
+        user = create_user('John')
+        user.team = {'balance': Decimal('10.5')}
+        set_json_backend('json')
+        try:
+            encoded = ''.join(iterencode_json(user, only=['team']))
+        finally:
+            set_json_backend(None)
+        assert encoded == '{"team": {"balance": "10.5"}}'
+
+
+class TestIterencodeJson(object):
+    def test_output_matches_as_json(self):
+        user = create_user('John')
+        user.friends = [create_user('Jack'), create_user('Jill')]
+        encoded = ''.join(user.iter_json())
+        assert json.loads(encoded) == user.as_json()
+
+    def test_supports_nested_specs(self):
+        user = create_user('John')
+        user.friends = [create_user('Jack')]
+        spec = dict(only=['name', ('friends', {'only': ['team']})])
+        encoded = ''.join(iterencode_json(user, **spec))
+        assert json.loads(encoded) == user.as_json(**spec)
+
+    def test_skips_empty_values(self):
+        user = create_user('John')
+        user.team = empty
+        assert json.loads(''.join(user.iter_json())) == {
+            'name': 'John',
+            'created_at': '2011-01-01T00:00:00Z',
+            'friends': []
+        }
+
+    def test_encodes_empty_objects(self):
+        assert ''.join(iterencode_json(Team(), only=['name'])) == '{}'
+
+    def test_supports_lists_of_objects(self):
+        users = [create_user('John'), create_user('Jack')]
+        encoded = ''.join(iterencode_json(users, only=['name']))
+        assert json.loads(encoded) == [{'name': 'John'}, {'name': 'Jack'}]
+
+    def test_yields_chunks_of_given_size(self):
+        users = [create_user('User %d' % i) for i in range(100)]
+        chunks = list(iterencode_json(users, chunk_size=256))
+        assert len(chunks) > 1
+        assert all(len(chunk) >= 256 for chunk in chunks[:-1])
+
+    def test_passes_encoder_options(self):
+        user = create_user('John')
+        encoded = ''.join(
+            iterencode_json(user, only=['name'], separators=(',', ':'))
+        )
+        assert encoded == '{"name":"John"}'
+
+    def test_supports_sort_keys(self):
+        user = create_user('John')
+        encoded = ''.join(
+            iterencode_json(user, only=['name', 'created_at'], sort_keys=True)
+        )
+        assert encoded == (
+            '{"created_at": "2011-01-01T00:00:00Z", "name": "John"}'
+        )
+
+    def test_encodes_nested_values_like_backends(self):
+        user = create_user('John')
+        user.team = {'founded': date(2000, 1, 1), 'missing': empty}
+        encoded = ''.join(iterencode_json(user, only=['team']))
+        assert json.loads(encoded) == json.loads(user.to_json(only=['team']))
+        assert json.loads(encoded) == {
+            'team': {'founded': '2000-01-01', 'missing': None}
+        }
+
+    def test_decimals_as_floats(self):
+        user = create_user('John')
+        user.team = {'balance': Decimal('10.5')}
+        encoded = ''.join(
+            iterencode_json(user, only=['team'], use_decimal=False)
+        )
+        assert encoded == '{"team": {"balance": 10.5}}'
+
+    def test_duplicate_aliases_use_last_value(self):
+        user = create_user('John')
+        user.alias = 'x'
+        encoded = ''.join(iterencode_json(user, only='basic'))
+        assert json.loads(encoded) == {'name': 'John', 'alias': 'John'}
+
+    def test_consumes_iterables_lazily(self):
+        consumed = []
+
+        def rows():
+            for index in range(10000):
+                consumed.append(index)
+                yield create_user('User %d' % index)
+
+        user = create_user('John')
+        user.friends = rows()
+        chunks = user.iter_json(only=['friends'], chunk_size=1024)
+        assert next(chunks).startswith('{"friends": [{')
+        assert len(consumed) < 100
+        encoded = ''.join(chunks)
+        assert len(consumed) == 10000
+        assert encoded.endswith('}]}')
+
+
+class TestDumpJson(object):
+    def test_writes_to_file_like_object(self):
+        fp = StringIO()
+        user = create_user('John')
+        user.to_json_stream(fp, only=['name'])
+        assert fp.getvalue() == '{"name": "John"}'
+
+    def test_dump_json_function(self):
+        fp = StringIO()
+        dump_json([create_user('John')], fp, only=['name'])
+        assert fp.getvalue() == '[{"name": "John"}]'
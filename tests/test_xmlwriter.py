@@ -0,0 +1,97 @@
+from io import BytesIO, StringIO
+
+from serializer import Dict2XML, Serializable
+from serializer.xmlwriter import dump_xml, dumps_xml, iterencode_xml
+
+
+class User(Serializable):
+    def attributes(self):
+        return ['name', 'age']
+
+
+STRUCTURE = {
+    'root': {
+        'a': 1,
+        'b': {'c': '<&">'},
+        'd': [1, {'e': 2}],
+        'f': {},
+        'g': '',
+        'h': [],
+        'i': None
+    }
+}
+
+
+class TestDumpsXml(object):
+    def test_compact_output(self):
+        assert dumps_xml(STRUCTURE) == (
+            '<?xml version="1.0" ?>\n'
+            '<root><a>1</a><b><c>&lt;&amp;&quot;&gt;</c></b><d>1</d>'
+            '<d><e>2</e></d><f/><g></g><i>None</i></root>\n'
+        )
+
+    def test_pretty_output(self):
+        assert dumps_xml(STRUCTURE, pretty=True) == (
+            '<?xml version="1.0" ?>\n'
+            '<root>\n'
+            '\t<a>1</a>\n'
+            '\t<b>\n'
+            '\t\t<c>&lt;&amp;&quot;&gt;</c>\n'
+            '\t</b>\n'
+            '\t<d>1</d>\n'
+            '\t<d>\n'
+            '\t\t<e>2</e>\n'
+            '\t</d>\n'
+            '\t<f/>\n'
+            '\t<g></g>\n'
+            '\t<i>None</i>\n'
+            '</root>\n'
+        )
+
+    def test_supports_root_element(self):
+        assert dumps_xml({'a': 1, 'b': 2}, root='user') == (
+            '<?xml version="1.0" ?>\n<user><a>1</a><b>2</b></user>\n'
+        )
+
+    def test_multiple_keys_without_root(self):
+        assert dumps_xml({'a': 1, 'b': 2}) == '<?xml version="1.0" ?>\n'
+
+    def test_supports_encoding(self):
+        assert dumps_xml({'a': u'\xe4'}, encoding='utf-8') == (
+            b'<?xml version="1.0" encoding="utf-8"?>\n<a>\xc3\xa4</a>\n'
+        )
+
+    def test_yields_chunks(self):
+        structure = {'users': {'user': [{'name': 'John'}] * 1000}}
+        chunks = list(iterencode_xml(structure, chunk_size=1024))
+        assert len(chunks) > 1
+        assert ''.join(chunks) == dumps_xml(structure)
+
+    def test_dump_xml_writes_to_file_like_objects(self):
+        fp = StringIO()
+        dump_xml({'a': 1}, fp)
+        assert fp.getvalue() == '<?xml version="1.0" ?>\n<a>1</a>\n'
+
+        fp = BytesIO()
+        dump_xml({'a': 1}, fp, encoding='utf-8')
+        assert fp.getvalue() == (
+            b'<?xml version="1.0" encoding="utf-8"?>\n<a>1</a>\n'
+        )
+
+
+class TestDict2XML(object):
+    def test_pretty_prints(self):
+        assert Dict2XML({'root': {'a': 1}})(indent='  ') == (
+            '<?xml version="1.0" ?>\n<root>\n  <a>1</a>\n</root>\n'
+        )
+
+
+class TestToXml(object):
+    def test_supports_root_and_pretty(self):
+        user = User()
+        user.name = 'John'
+        user.age = 13
+        assert user.to_xml(root='user', pretty=True) == (
+            '<?xml version="1.0" ?>\n'
+            '<user>\n\t<name>John</name>\n\t<age>13</age>\n</user>\n'
+        )